@@ -4,31 +4,19 @@
 from pptx import Presentation
 from pptx.util import Inches, Pt
 import os
-import tempfile
-import shutil
-import zipfile
+import sys
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-TEMPLATE_PATH = os.path.join(ROOT, "templates", "2026_Insight_PPT_Template.potx")
-OUTPUT = os.path.join(ROOT, "templates", "2026_Insight_PPT_Template_Summary.potx")
+sys.path.insert(0, os.path.join(ROOT, "src"))
 
-# Convert .potx to .pptx temporarily
-temp_dir = tempfile.mkdtemp()
-temp_pptx = os.path.join(temp_dir, "temp.pptx")
+from charts import SUMMARY_CHARTS, add_bound_charts
+from opc import open_template
 
-with zipfile.ZipFile(TEMPLATE_PATH, 'r') as zip_in:
-    with zipfile.ZipFile(temp_pptx, 'w') as zip_out:
-        for item in zip_in.infolist():
-            data = zip_in.read(item.filename)
-            if item.filename == '[Content_Types].xml':
-                data = data.replace(
-                    b'application/vnd.openxmlformats-officedocument.presentationml.template.main+xml',
-                    b'application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml'
-                )
-            zip_out.writestr(item, data)
+TEMPLATE_PATH = os.path.join(ROOT, "templates", "2026_Insight_PPT_Template.potx")
+OUTPUT = os.path.join(ROOT, "templates", "2026_Insight_PPT_Template_Summary.potx")
 
 # Load the insight template
-prs = Presentation(temp_pptx)
+prs = Presentation(open_template(TEMPLATE_PATH))
 
 # Remove existing slides
 while len(prs.slides) > 0:
@@ -53,7 +41,7 @@ for shape in list(slide.shapes):
 # Add summary data to content area via textbox (since placeholder approach isn't working)
 left = Inches(0.5)
 top = Inches(1.5)
-width = Inches(9)
+width = prs.slide_width // 2 - left
 height = Inches(5)
 text_box = slide.shapes.add_textbox(left, top, width, height)
 tf = text_box.text_frame
@@ -83,9 +71,9 @@ for i, (label, placeholder) in enumerate(fields):
         p.text = ""
     p.font.size = Pt(18)
 
+# Charts filled from the breakdown metrics on the right half
+chart_left = prs.slide_width // 2
+add_bound_charts(slide, SUMMARY_CHARTS, chart_left, top, prs.slide_width - chart_left - Inches(0.5), height)
+
 prs.save(OUTPUT)
 print(f"Created: {OUTPUT}")
-
-# Cleanup
-shutil.rmtree(temp_dir, ignore_errors=True)
-
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""Benchmark deck generation across data and template sizes.
+
+Synthesizes CSV datasets (rows x columns) and templates with text boxes,
+tables, pictures or many placeholders, then renders every combination
+through ``generate_ppt.render`` in a fresh process with the template and
+sheet caches off. Each case records rows/sec, per-slide latency
+percentiles, peak RSS and output size. Results go to a JSON file that
+`--compare` can diff against a run from another commit.
+
+    python pptgen/scripts/benchmark.py --quick --json before.json
+    python pptgen/scripts/benchmark.py --quick --json after.json
+    python pptgen/scripts/benchmark.py --compare before.json after.json
+
+`--table-fill` instead times filling a styled table of N records cell by
+cell through python-pptx against one ``tables.fill_table`` call.
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from instrument import Timings
+
+ROWS = [10, 100, 1000, 10000, 100000]
+WIDTHS = {"narrow": 4, "wide": 40, "very_wide": 200}
+TEMPLATES = ["text", "table", "picture", "many"]
+QUICK_ROWS = [10, 1000]
+QUICK_WIDTHS = ["narrow", "wide"]
+TABLE_ROWS = [100, 500, 2000]
+TABLE_COLUMNS = ["Client", "Project Name", "Days to Sign", "Rev"]
+
+
+def make_data(path, rows, width):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([f"col{j}" for j in range(width)])
+        for i in range(rows):
+            writer.writerow([f"value {i}-{j} & <text>" for j in range(width)])
+
+
+def make_template(path, kind, width):
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "{col0}"
+    body = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(1)).text_frame
+    body.text = "Detail: {col1} / {%s}" % f"col{min(2, width - 1)}"
+
+    if kind == "table":
+        cols = min(width, 4)
+        table = slide.shapes.add_table(4, cols, Inches(0.5), Inches(3), Inches(9), Inches(2)).table
+        for r in range(4):
+            for c in range(cols):
+                table.cell(r, c).text = f"Header {c}" if r == 0 else "{col%d}" % ((r * cols + c) % width)
+    elif kind == "picture":
+        from PIL import Image
+
+        logo = os.path.join(os.path.dirname(path), "logo.png")
+        Image.new("RGB", (256, 256), (31, 78, 121)).save(logo)
+        slide.shapes.add_picture(logo, Inches(8), Inches(0.2), Inches(1), Inches(1))
+    elif kind == "many":
+        tf = slide.shapes.add_textbox(Inches(0.5), Inches(2.5), Inches(9), Inches(4)).text_frame
+        for j in range(50):
+            p = tf.paragraphs[0] if j == 0 else tf.add_paragraph()
+            p.text = "F%d: {col%d}" % (j, j % width)
+            p.font.size = Pt(6)
+    prs.save(path)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class SlideTimings(Timings):
+    """Timings that also keep each slide's render and write times."""
+
+    def __init__(self):
+        super().__init__()
+        self.per_call = {"render": [], "write": []}
+
+    def add(self, name, wall, cpu, calls=1):
+        super().add(name, wall, cpu, calls)
+        if name in self.per_call:
+            self.per_call[name].append(wall)
+
+
+def run_case(case):
+    """Render one case in this process and return its measurements."""
+    from generate_ppt import render
+
+    # The public entry point, from template load to the finished file; a
+    # slide's latency is its render plus its write
+    timings = SlideTimings()
+    start = time.perf_counter()
+    render(case["template_path"], case["data_path"], case["output_path"], timings=timings)
+    elapsed = time.perf_counter() - start
+    latencies = [sum(pair) for pair in zip(timings.per_call["render"], timings.per_call["write"])]
+
+    latencies.sort()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024  # Linux reports KiB
+    return {
+        "seconds": elapsed,
+        "rows_per_sec": case["rows"] / elapsed if elapsed else 0.0,
+        "latency_ms": {f"p{p}": percentile(latencies, p) * 1000 for p in (50, 90, 99)},
+        "peak_rss_mb": peak / 2**20,
+        "output_bytes": os.path.getsize(case["output_path"]),
+    }
+
+
+def _styled_table(rows):
+    # A header plus ``rows`` body rows styled like the Out for Signature table
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    table = slide.shapes.add_table(rows + 1, len(TABLE_COLUMNS), Inches(0.5), Inches(1.3), Inches(9), Inches(0.84)).table
+    for col_idx, header in enumerate(TABLE_COLUMNS):
+        table.cell(0, col_idx).text = header
+        table.cell(0, col_idx).text_frame.paragraphs[0].font.bold = True
+    for row_idx in range(1, rows + 1):
+        for col_idx in range(len(TABLE_COLUMNS)):
+            table.cell(row_idx, col_idx).text_frame.paragraphs[0].font.size = Pt(9)
+    return table
+
+
+def run_table_fill(rows):
+    """Time per-cell python-pptx setters against tables.fill_table for ``rows`` records."""
+    import pandas as pd
+    from pptx.util import Pt
+
+    from formatting import ValueFormat
+    from tables import fill_table
+
+    frame = pd.DataFrame({
+        "Client": [f"Client {i % 40} & Co" for i in range(rows)],
+        "Project Name": [f"Project {i} <phase {i % 3}>" for i in range(rows)],
+        "Days to Sign": [i % 30 for i in range(rows)],
+        "Rev": [i * 1250.5 for i in range(rows)],
+    })
+    currency = ValueFormat("$,.0f")
+
+    table = _styled_table(rows)
+    start = time.perf_counter()
+    for row_idx, record in enumerate(frame.itertuples(index=False, name=None), 1):
+        for col_idx, value in enumerate(record):
+            text_frame = table.cell(row_idx, col_idx).text_frame
+            text_frame.clear()
+            text_frame.text = currency(value) if col_idx == 3 else str(value)
+            text_frame.paragraphs[0].font.size = Pt(9)
+    per_cell = time.perf_counter() - start
+    expected = [cell.text for row in table.rows for cell in row.cells]
+
+    table = _styled_table(1)
+    start = time.perf_counter()
+    fill_table(table, frame, formats={"Rev": "$,.0f"})
+    bulk = time.perf_counter() - start
+    if [cell.text for row in table.rows for cell in row.cells] != expected:
+        raise RuntimeError("fill_table and the per-cell path produced different text")
+    return {
+        "name": f"table_fill/{rows}",
+        "rows": rows,
+        "per_cell_ms": per_cell * 1000,
+        "bulk_ms": bulk * 1000,
+        "speedup": per_cell / bulk if bulk else 0.0,
+    }
+
+
+def run_matrix(rows_list, widths, templates, workdir):
+    results = []
+    for width_name in widths:
+        width = WIDTHS[width_name]
+        for kind in templates:
+            template_path = os.path.join(workdir, f"{kind}_{width_name}.pptx")
+            make_template(template_path, kind, width)
+            for rows in rows_list:
+                data_path = os.path.join(workdir, f"data_{rows}_{width_name}.csv")
+                if not os.path.exists(data_path):
+                    make_data(data_path, rows, width)
+                case = {
+                    "name": f"{kind}/{width_name}/{rows}",
+                    "template": kind,
+                    "width": width,
+                    "rows": rows,
+                    "template_path": template_path,
+                    "data_path": data_path,
+                    "output_path": os.path.join(workdir, "out.pptx"),
+                }
+                # A fresh interpreter per case keeps peak RSS per case, and
+                # with the caches off every case compiles its template cold
+                proc = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+                    check=True, capture_output=True, text=True, env=dict(os.environ, PPTGEN_NO_CACHE="1"),
+                )
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+                result.update({k: case[k] for k in ("name", "template", "width", "rows")})
+                results.append(result)
+                print(
+                    f"{result['name']:<24} {result['rows_per_sec']:>10,.0f} rows/s  "
+                    f"p50 {result['latency_ms']['p50']:.3f} ms  p99 {result['latency_ms']['p99']:.3f} ms  "
+                    f"{result['peak_rss_mb']:6.1f} MB  {result['output_bytes']:>12,} bytes"
+                )
+    return results
+
+
+def git_commit():
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT)
+    return proc.stdout.strip() or None
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = {case["name"]: case for case in json.load(f)["cases"]}
+    with open(after_path) as f:
+        after = json.load(f)["cases"]
+    print(f"{'case':<24} {'rows/s':>12} {'p99 ms':>10} {'RSS MB':>10} {'bytes':>10}")
+    for case in after:
+        old = before.get(case["name"])
+        if old is None:
+            continue
+
+        def delta(new, prev):
+            return f"{(new - prev) / prev * 100:+.1f}%" if prev else "n/a"
+
+        print(
+            f"{case['name']:<24} {delta(case['rows_per_sec'], old['rows_per_sec']):>12} "
+            f"{delta(case['latency_ms']['p99'], old['latency_ms']['p99']):>10} "
+            f"{delta(case['peak_rss_mb'], old['peak_rss_mb']):>10} "
+            f"{delta(case['output_bytes'], old['output_bytes']):>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deck generation")
+    parser.add_argument("--rows", type=int, nargs="+", default=None, help=f"Row counts (default {ROWS})")
+    parser.add_argument("--widths", nargs="+", choices=sorted(WIDTHS), default=None)
+    parser.add_argument("--templates", nargs="+", choices=TEMPLATES, default=TEMPLATES)
+    parser.add_argument("--quick", action="store_true", help="Small matrix for a fast sanity check")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two result files")
+    parser.add_argument(
+        "--table-fill", action="store_true", help="Compare per-cell table filling with tables.fill_table"
+    )
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.table_fill:
+        results = []
+        for rows in args.rows or TABLE_ROWS:
+            result = run_table_fill(rows)
+            results.append(result)
+            print(
+                f"{result['name']:<24} per-cell {result['per_cell_ms']:>9.1f} ms  "
+                f"fill_table {result['bulk_ms']:>8.1f} ms  {result['speedup']:>6.1f}x"
+            )
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"commit": git_commit(), "python": sys.version.split()[0], "table_fill": results}, f, indent=2)
+            print(f"Wrote {args.json}")
+        return
+
+    rows_list = args.rows or (QUICK_ROWS if args.quick else ROWS)
+    widths = args.widths or (QUICK_WIDTHS if args.quick else list(WIDTHS))
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run_matrix(rows_list, widths, args.templates, workdir)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"commit": git_commit(), "python": sys.version.split()[0], "cases": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,31 +6,18 @@ from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 import os
-import tempfile
-import shutil
-import zipfile
+import sys
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from opc import open_template
+
 TEMPLATE_PATH = os.path.join(ROOT, "templates", "2026_Insight_PPT_Template.potx")
 OUTPUT = os.path.join(ROOT, "templates", "2026_Insight_PPT_Template_OutForSig.potx")
 
-# Convert .potx to .pptx temporarily
-temp_dir = tempfile.mkdtemp()
-temp_pptx = os.path.join(temp_dir, "temp.pptx")
-
-with zipfile.ZipFile(TEMPLATE_PATH, 'r') as zip_in:
-    with zipfile.ZipFile(temp_pptx, 'w') as zip_out:
-        for item in zip_in.infolist():
-            data = zip_in.read(item.filename)
-            if item.filename == '[Content_Types].xml':
-                data = data.replace(
-                    b'application/vnd.openxmlformats-officedocument.presentationml.template.main+xml',
-                    b'application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml'
-                )
-            zip_out.writestr(item, data)
-
 # Load the insight template
-prs = Presentation(temp_pptx)
+prs = Presentation(open_template(TEMPLATE_PATH))
 
 # Remove existing slides
 while len(prs.slides) > 0:
@@ -52,12 +39,13 @@ for shape in list(slide.shapes):
         sp = shape.element
         sp.getparent().remove(sp)
 
-# Add table - adjusted for actual available space
-rows, cols = 8, 4  # Header + 7 projects, 4 columns
+# Add table - a header plus one repeating row that the generator expands per
+# project, continuing on further slides when it runs out of room
+rows, cols = 2, 4
 left = Inches(0.5)
 top = Inches(1.3)
 width = Inches(9)
-height = Inches(3.5)
+height = Inches(0.84)
 
 table_shape = slide.shapes.add_table(rows, cols, left, top, width, height)
 table = table_shape.table
@@ -87,13 +75,13 @@ for col_idx, header in enumerate(headers):
     fill.solid()
     fill.fore_color.rgb = RGBColor(31, 78, 121)
 
-# Add placeholder rows with field names
+# Add the repeating row; {*column} repeats the row for every record
 for row_idx in range(1, rows):
-    table.cell(row_idx, 0).text = f"{{Client_{row_idx}}}"
-    table.cell(row_idx, 1).text = f"{{Project_Name_{row_idx}}}"
-    table.cell(row_idx, 2).text = f"{{Days_to_Sign_{row_idx}}}"
-    table.cell(row_idx, 3).text = f"{{Revenue_{row_idx}}}"
-    
+    table.cell(row_idx, 0).text = "{*Client}"
+    table.cell(row_idx, 1).text = "{*Project Name}"
+    table.cell(row_idx, 2).text = "{*Days to Sign}"
+    table.cell(row_idx, 3).text = "{*Rev:$,.0f}"
+
     # Format cells
     for col_idx in range(cols):
         cell = table.cell(row_idx, col_idx)
@@ -104,6 +92,3 @@ for row_idx in range(1, rows):
 
 prs.save(OUTPUT)
 print(f"Created: {OUTPUT}")
-
-# Cleanup
-shutil.rmtree(temp_dir, ignore_errors=True)
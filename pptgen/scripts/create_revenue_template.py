@@ -31,10 +31,10 @@ for shape in slide.placeholders:
                 ("AE", "{AE}"),
                 ("Practice Area", "{Practice Area}"),
                 ("Status", "{Status}"),
-                ("Date Signed", "{Date Signed}"),
+                ("Date Signed", "{Date Signed:%Y-%m-%d}"),
                 ("Resources", "{Resource(s)}"),
-                ("Revenue", "${Rev}"),
-                ("GP %", "{GP %}"),
+                ("Revenue", "{Rev:$,.0f}"),
+                ("GP %", "{GP %:.1%}"),
                 ("Hours", "{Hours}"),
                 ("Comment", "{Comment}"),
             ]
@@ -1,50 +1,32 @@
 #!/usr/bin/env python3
 """Generate a summary PPT from Excel data."""
 
-import subprocess
 import os
 import sys
-import pandas as pd
-import tempfile
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from generate_ppt import render
+from metrics import REVENUE_SUMMARY, as_text, evaluate, load_frame
+
 DATA = os.path.join(ROOT, "data", "Practice Revenue Tracking 2025.xlsx")
 TEMPLATE = os.path.join(ROOT, "templates", "2026_Insight_PPT_Template_Summary.potx")
 OUTPUT_DIR = os.path.join(ROOT, "out")
 OUTPUT = os.path.join(OUTPUT_DIR, "revenue_summary.pptx")
-GENERATOR = os.path.join(ROOT, "src", "generate_ppt.py")
-
-# Create summary data
-df = pd.read_excel(DATA, sheet_name='Detail')
-df['Rev'] = pd.to_numeric(df['Rev'], errors='coerce')
-df['Hours'] = pd.to_numeric(df['Hours'], errors='coerce')
-df['GP $'] = pd.to_numeric(df['GP $'], errors='coerce')
-df['GP %'] = pd.to_numeric(df['GP %'], errors='coerce')
-
-summary_df = pd.DataFrame([{
-    'Total Revenue': f"${df['Rev'].sum():,.2f}",
-    'Total Clients': str(df['Client'].nunique()),
-    'Total Projects': str(len(df)),
-    'Won Projects': str(len(df[df['Status'] == 'Won'])),
-    'Average Revenue per Project': f"${df['Rev'].mean():,.2f}",
-    'Total GP $': f"${df['GP $'].sum():,.2f}",
-    'Average GP %': f"{df['GP %'].mean():.1%}",
-    'Top Client': df.groupby('Client')['Rev'].sum().idxmax(),
-    'Top Client Revenue': f"${df.groupby('Client')['Rev'].sum().max():,.2f}",
-}])
-
-# Write summary to temporary CSV
-summary_csv = os.path.join(tempfile.gettempdir(), 'summary.csv')
-summary_df.to_csv(summary_csv, index=False)
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Metrics drawn as charts rather than text
+CHART_METRICS = ("Revenue by Client", "Status Breakdown")
 
-cmd = ["python", GENERATOR, "--data", summary_csv, "--template", TEMPLATE, "--output", OUTPUT]
-print("Running:", " ".join(cmd))
-proc = subprocess.run(cmd, capture_output=True, text=True)
-print(proc.stdout)
-if proc.stderr:
-    print("STDERR:", proc.stderr)
+# Compute every KPI from one read of the columns they use
+df = load_frame(DATA, REVENUE_SUMMARY, sheet='Detail')
+values = evaluate(df, REVENUE_SUMMARY)
+summary = as_text(values, REVENUE_SUMMARY)
+# Bound charts take the computed values, not their text
+summary.update((name, values[name]) for name in CHART_METRICS)
+
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+render(TEMPLATE, [summary], OUTPUT)
 
 if os.path.exists(OUTPUT):
     file_size = os.path.getsize(OUTPUT)
@@ -52,10 +34,3 @@ if os.path.exists(OUTPUT):
 else:
     print("\n✗ Failed to create summary PPT")
     sys.exit(1)
-
-# Cleanup
-try:
-    os.remove(summary_csv)
-except:
-    pass
-
@@ -2,10 +2,15 @@
 """Create a single-slide summary template for revenue data."""
 
 from pptx import Presentation
-from pptx.util import Pt
+from pptx.util import Inches, Pt
 import os
+import sys
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from charts import SUMMARY_CHARTS, add_bound_charts
+
 OUTPUT = os.path.join(ROOT, "templates", "Revenue_Summary_Template.potx")
 
 prs = Presentation()
@@ -16,10 +21,14 @@ slide = prs.slides.add_slide(layout)
 if slide.shapes.title:
     slide.shapes.title.text = "2025 Practice Revenue Summary"
 
-# Content
+# Content on the left half, next to the charts; without a body placeholder
+# the charts take this box
+top, height = Inches(1.5), Inches(5)
 for shape in slide.placeholders:
     if shape.placeholder_format.type == 7:  # BODY
         if shape.has_text_frame:
+            top, height = shape.top, shape.height
+            shape.width = prs.slide_width // 2 - shape.left
             tf = shape.text_frame
             tf.clear()
             
@@ -48,5 +57,9 @@ for shape in slide.placeholders:
                 p.font.size = Pt(16)
             break
 
+# Charts filled from the breakdown metrics on the right half
+chart_left = prs.slide_width // 2
+add_bound_charts(slide, SUMMARY_CHARTS, chart_left, top, prs.slide_width - chart_left - Inches(0.5), height)
+
 prs.save(OUTPUT)
 print(f"Created summary template: {OUTPUT}")
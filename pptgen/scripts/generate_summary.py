@@ -1,35 +1,19 @@
 #!/usr/bin/env python3
 """Generate summary statistics from the revenue data."""
 
-import pandas as pd
 import os
+import sys
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA = os.path.join(ROOT, "data", "Practice Revenue Tracking 2025.xlsx")
+sys.path.insert(0, os.path.join(ROOT, "src"))
 
-df = pd.read_excel(DATA, sheet_name='Detail')
+from metrics import REVENUE_SUMMARY, as_text, evaluate, load_frame
 
-# Clean numeric columns
-df['Rev'] = pd.to_numeric(df['Rev'], errors='coerce')
-df['Hours'] = pd.to_numeric(df['Hours'], errors='coerce')
-df['GP $'] = pd.to_numeric(df['GP $'], errors='coerce')
-df['GP %'] = pd.to_numeric(df['GP %'], errors='coerce')
+DATA = os.path.join(ROOT, "data", "Practice Revenue Tracking 2025.xlsx")
 
-# Calculate summary stats
-summary = {
-    'Total Revenue': f"${df['Rev'].sum():,.2f}",
-    'Total Hours': f"{df['Hours'].sum():,.0f}",
-    'Total Projects': len(df),
-    'Total Clients': df['Client'].nunique(),
-    'Average Revenue per Project': f"${df['Rev'].mean():,.2f}",
-    'Average Hours per Project': f"{df['Hours'].mean():,.1f}",
-    'Total GP $': f"${df['GP $'].sum():,.2f}",
-    'Average GP %': f"{df['GP %'].mean():.1%}",
-    'Top Client': df.groupby('Client')['Rev'].sum().idxmax(),
-    'Top Client Revenue': f"${df.groupby('Client')['Rev'].sum().max():,.2f}",
-    'Won Projects': len(df[df['Status'] == 'Won']),
-    'Status Breakdown': df['Status'].value_counts().to_dict(),
-}
+# Read only the columns the metrics use and compute them together
+df = load_frame(DATA, REVENUE_SUMMARY, sheet='Detail')
+summary = evaluate(df, REVENUE_SUMMARY)
 
-for key, val in summary.items():
+for key, val in as_text(summary, REVENUE_SUMMARY).items():
     print(f"{key}: {val}")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Measure generator import and startup time.
+
+Reports the slowest imports of generate_ppt, the wall time of `--help` and
+of a small CSV run, and which heavy packages each path loaded. Pass
+`--json PATH` to keep the numbers for comparison between commits.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+GENERATOR = os.path.join(SRC, "generate_ppt.py")
+DATA = os.path.join(ROOT, "data", "sample_data.csv")
+TEMPLATE = os.path.join(ROOT, "scripts", "template.pptx")
+HEAVY = ["pandas", "numpy", "openpyxl", "pptx", "lxml.etree", "concurrent.futures"]
+
+# Prints which heavy packages ended up in sys.modules after the given code
+LOADED = "import sys, json; {code}; print(json.dumps([m for m in {heavy} if m in sys.modules]))"
+
+
+def wall_time(cmd, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, capture_output=True, cwd=SRC)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def slowest_imports(top):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import generate_ppt"],
+        check=True, capture_output=True, text=True, cwd=SRC,
+    )
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return imports[:top]
+
+
+def loaded_modules(code):
+    proc = subprocess.run(
+        [sys.executable, "-c", LOADED.format(code=code, heavy=HEAVY)],
+        check=True, capture_output=True, text=True, cwd=SRC,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per timing (median is reported)")
+    parser.add_argument("--json", default=None, help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    output = os.path.join(tempfile.mkdtemp(), "startup.pptx")
+    csv_cmd = [sys.executable, GENERATOR, "--data", DATA, "--template", TEMPLATE, "--output", output]
+    results = {
+        "python": sys.version.split()[0],
+        "import_s": wall_time([sys.executable, "-c", "import generate_ppt"], args.runs),
+        "help_s": wall_time([sys.executable, GENERATOR, "--help"], args.runs),
+        "csv_run_s": wall_time(csv_cmd, args.runs),
+        "slowest_imports": slowest_imports(10),
+        "loaded_on_import": loaded_modules("import generate_ppt"),
+        "loaded_on_csv_run": loaded_modules(
+            f"import generate_ppt; generate_ppt.render({TEMPLATE!r}, {DATA!r}, {output!r})"
+        ),
+    }
+
+    print(f"import generate_ppt : {results['import_s'] * 1000:7.1f} ms")
+    print(f"generate_ppt --help : {results['help_s'] * 1000:7.1f} ms")
+    print(f"sample CSV run      : {results['csv_run_s'] * 1000:7.1f} ms")
+    print("heavy modules on import :", ", ".join(results["loaded_on_import"]) or "none")
+    print("heavy modules on CSV run:", ", ".join(results["loaded_on_csv_run"]) or "none")
+    print("slowest imports (cumulative):")
+    for name, seconds in results["slowest_imports"]:
+        print(f"  {seconds * 1000:7.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
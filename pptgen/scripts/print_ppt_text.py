@@ -1,36 +1,187 @@
-import sys
-from pptx import Presentation
+#!/usr/bin/env python3
+"""Print the text of generated decks, or check them for leftover placeholders.
+
+Slide parts are streamed straight from the zip with lxml's iterparse, so
+no presentation object model is built. Text boxes, table cells and shapes
+inside groups are all read, in slide order.
+
+    python pptgen/scripts/print_ppt_text.py out/deck.pptx
+    python pptgen/scripts/print_ppt_text.py out/*.pptx --check --workers 4
+
+With --check, every unreplaced {placeholder} is reported with its slide,
+shape and table cell, and the exit status is 1 if any were found.
+"""
+
+import argparse
 import os
+import sys
+import zipfile
+
+from lxml import etree
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from engine import A_NS, NS, P_NS, PLACEHOLDER_RE, R_NS, RT_OFFICE_DOCUMENT, rels_path, resolve
+
+DEFAULT_DECK = os.path.join(ROOT, "out", "test_output.pptx")
+
+_SHAPES = {f"{{{P_NS}}}{tag}" for tag in ("sp", "graphicFrame", "pic", "cxnSp")}
+_GROUP = f"{{{P_NS}}}grpSp"
+_C_NV_PR = f"{{{P_NS}}}cNvPr"
+_TR, _TC, _P = f"{{{A_NS}}}tr", f"{{{A_NS}}}tc", f"{{{A_NS}}}p"
+_RUNS = {f"{{{A_NS}}}r", f"{{{A_NS}}}fld"}
+_BR, _T = f"{{{A_NS}}}br", f"{{{A_NS}}}t"
+
+
+def slide_parts(zf):
+    """Return the deck's slide part names in presentation order."""
+    root_rels = etree.fromstring(zf.read("_rels/.rels"))
+    main = next(rel.get("Target") for rel in root_rels if rel.get("Type") == RT_OFFICE_DOCUMENT).lstrip("/")
+    rels = {rel.get("Id"): rel.get("Target") for rel in etree.fromstring(zf.read(rels_path(main)))}
+    sld_id_lst = etree.fromstring(zf.read(main)).find("p:sldIdLst", NS)
+    if sld_id_lst is None:
+        return []
+    return [resolve(main, rels[sld_id.get(f"{{{R_NS}}}id")]) for sld_id in sld_id_lst]
+
+
+def _paragraph_text(p):
+    parts = []
+    for child in p:
+        if child.tag in _RUNS:
+            t = child.find(_T)
+            if t is not None and t.text:
+                parts.append(t.text)
+        elif child.tag == _BR:
+            parts.append("\n")
+    return "".join(parts)
+
 
-def get_text_from_shape(shape):
-    texts = []
-    if hasattr(shape, 'text') and shape.text and shape.text.strip():
-        texts.append(shape.text)
-    elif hasattr(shape, 'text_frame') and shape.text_frame is not None:
-        for para in shape.text_frame.paragraphs:
-            if para.text and para.text.strip():
-                texts.append(para.text)
-    return texts
-
-
-def main(path=None):
-    if path is None:
-        path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'out', 'test_output.pptx')
-    if not os.path.exists(path):
-        print(f"File not found: {path}")
+def shape_texts(stream):
+    """Yield ``(shape, cell, text)`` for each shape or table cell holding text.
+
+    ``shape`` is the shape's name prefixed by any enclosing group names and
+    ``cell`` is the ``(row, col)`` of a table cell, else None.
+    """
+    groups = []
+    shapes = []  # open shapes: [name, row, col, {cell: [paragraphs]}]
+    for event, elem in etree.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag in _SHAPES:
+                shapes.append(["", -1, -1, {}])
+            elif tag == _GROUP:
+                groups.append("")
+            elif shapes and tag == _TR:
+                shapes[-1][1] += 1
+                shapes[-1][2] = -1
+            elif shapes and tag == _TC:
+                shapes[-1][2] += 1
+            continue
+
+        if tag == _C_NV_PR:
+            # The name belongs to the innermost shape or group still unnamed
+            if shapes and not shapes[-1][0]:
+                shapes[-1][0] = elem.get("name", "") or f"#{elem.get('id')}"
+            elif groups and not groups[-1]:
+                groups[-1] = elem.get("name", "") or f"#{elem.get('id')}"
+        elif tag == _P and shapes:
+            shape = shapes[-1]
+            cell = (shape[1], shape[2]) if shape[1] >= 0 else None
+            shape[3].setdefault(cell, []).append(_paragraph_text(elem))
+        elif tag in _SHAPES:
+            name, _, _, cells = shapes.pop()
+            path = "/".join(groups + [name])
+            for cell, paragraphs in cells.items():
+                text = "\n".join(paragraphs)
+                if text.strip():
+                    yield path, cell, text
+            elem.clear()
+        elif tag == _GROUP:
+            groups.pop()
+            elem.clear()
+
+
+def read_deck(path, check=False):
+    """Return ``(lines, leftovers)`` for one deck.
+
+    ``lines`` is the printable text dump (empty when checking) and
+    ``leftovers`` lists ``(slide, shape, cell, token)`` for unreplaced tokens.
+    """
+    lines = []
+    leftovers = []
+    with zipfile.ZipFile(path) as zf:
+        for number, partname in enumerate(slide_parts(zf), start=1):
+            if not check:
+                lines.append(f"--- Slide {number} ---")
+            any_text = False
+            with zf.open(partname) as stream:
+                for shape, cell, text in shape_texts(stream):
+                    any_text = True
+                    if check:
+                        for match in PLACEHOLDER_RE.finditer(text):
+                            leftovers.append((number, shape, cell, match.group(0)))
+                    elif cell is None:
+                        lines.append(text)
+                    else:
+                        lines.append(f"[{cell[0] + 1},{cell[1] + 1}] {text}")
+            if not (check or any_text):
+                lines.append("(no text found)")
+    return lines, leftovers
+
+
+def _read(args):
+    path, check = args
+    try:
+        return path, read_deck(path, check), None
+    except (OSError, KeyError, StopIteration, zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        return path, ([], []), f"{type(e).__name__}: {e}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("decks", nargs="*", help=f"Decks to read (default {DEFAULT_DECK})")
+    parser.add_argument("--check", action="store_true", help="Report leftover {placeholder} tokens instead of text")
+    parser.add_argument("--workers", type=int, default=1, help="Read decks across N processes")
+    args = parser.parse_args()
+
+    decks = args.decks or [DEFAULT_DECK]
+    missing = [path for path in decks if not os.path.exists(path)]
+    if missing:
+        for path in missing:
+            print(f"File not found: {path}")
         sys.exit(2)
-    prs = Presentation(path)
-    for i, slide in enumerate(prs.slides, start=1):
-        print(f"--- Slide {i} ---")
-        any_text = False
-        for shape in slide.shapes:
-            texts = get_text_from_shape(shape)
-            for t in texts:
-                any_text = True
-                print(t)
-        if not any_text:
-            print("(no text found)")
-
-if __name__ == '__main__':
-    arg = sys.argv[1] if len(sys.argv) > 1 else None
-    main(arg)
+
+    jobs = [(path, args.check) for path in decks]
+    if args.workers > 1 and len(decks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(_read, jobs, chunksize=max(1, len(jobs) // (args.workers * 4))))
+    else:
+        results = map(_read, jobs)
+
+    failed = False
+    total = 0
+    for path, (lines, leftovers), error in results:
+        if error:
+            failed = True
+            print(f"{path}: cannot read deck ({error})")
+            continue
+        if len(decks) > 1 and not args.check:
+            print(f"=== {path} ===")
+        for line in lines:
+            print(line)
+        for slide, shape, cell, token in leftovers:
+            where = f" cell {cell[0] + 1},{cell[1] + 1}" if cell else ""
+            print(f"{path}: slide {slide}, shape '{shape}'{where}: {token}")
+        total += len(leftovers)
+
+    if args.check:
+        print(f"{total} leftover placeholder(s) in {len(decks)} deck(s)")
+        failed = failed or total > 0
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 from pptx import Presentation
 from pptx.util import Inches, Pt
-import subprocess
+import sys
 import os
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from generate_ppt import render
+
 DATA = os.path.join(ROOT, "data", "sample_data.csv")
 TEMPLATE = os.path.join(ROOT, "scripts", "template.pptx")
 OUTPUT_DIR = os.path.join(ROOT, "out")
 OUTPUT = os.path.join(OUTPUT_DIR, "test_output.pptx")
-GENERATOR = os.path.join(ROOT, "src", "generate_ppt.py")
 
 # Create template with placeholders
 prs = Presentation()
@@ -32,12 +35,7 @@ print(f"Wrote template: {TEMPLATE}")
 # Ensure output dir exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Run the generator script
-cmd = ["python", GENERATOR, "--data", DATA, "--template", TEMPLATE, "--output", OUTPUT]
-print("Running:", " ".join(cmd))
-proc = subprocess.run(cmd, capture_output=True, text=True)
-print(proc.stdout)
-print(proc.stderr)
+render(TEMPLATE, DATA, OUTPUT)
 
 if os.path.exists(OUTPUT):
     print("Test succeeded, output written:", OUTPUT)
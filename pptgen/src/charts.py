@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""Chart data binding at the XML level.
+
+A chart on a template slide is bound to data by putting ``{column}`` in
+its alt text (or its shape name). The chart part is compiled once, like a
+slide: every series is cut into literal chunks around its name, category
+and value slots, and each generated slide's chart is one string join of
+those chunks with the row's data written as literal caches (``strLit`` /
+``numLit``). The chart's link to its embedded workbook is dropped, so no
+workbook is opened or rewritten while a deck renders.
+
+A bound column holding a DataFrame, Series, dict or list of
+``(category, value)`` pairs fills the whole chart: a DataFrame gives one
+series per column over its index, the others one series named after the
+column. A chart bound to several columns of scalar values (e.g.
+``{Rev} {Budget}``) gets one series whose categories are those columns.
+The template's series keep their formatting; extra data series take the
+last template series' formatting and unused template series are left out.
+
+Charts stay viewable without a workbook, but PowerPoint's "Edit Data"
+needs one; ``embed_workbooks`` adds them to a finished deck in one pass:
+
+    python pptgen/src/charts.py out/deck.pptx
+"""
+
+import argparse
+import io
+import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
+
+from lxml import etree
+
+from engine import (
+    C_NS,
+    CONTENT_TYPES,
+    CT_NS,
+    NS,
+    PKG_REL_NS,
+    R_NS,
+    escape,
+    mark_region,
+    rels_path,
+    serialize,
+    slot,
+    split_regions,
+    split_slots,
+)
+from ingest import cell_text
+from opc import copy_member
+
+CT_CHART = "application/vnd.openxmlformats-officedocument.drawingml.chart+xml"
+CT_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+RT_PACKAGE = R_NS + "/package"
+
+# Series children that hold data, by the slot they become
+_DATA_TAGS = {"tx": ("tx",), "cat": ("cat", "xVal"), "val": ("val", "yVal")}
+# Summary template charts, bound to the breakdown metrics of
+# metrics.REVENUE_SUMMARY: (column, python-pptx chart type, number format)
+SUMMARY_CHARTS = [
+    ("Revenue by Client", "BAR_CLUSTERED", "$#,##0"),
+    ("Status Breakdown", "PIE", "General"),
+]
+CHART_GAP_EMU = 228600  # 0.25 in between stacked charts
+# chartSpace children that must follow c:externalData
+_AFTER_EXTERNAL_DATA = ("printSettings", "userShapes", "extLst")
+
+
+def _number(value):
+    # Text of a numeric cache point, or None for a gap
+    if isinstance(value, str):
+        try:
+            value = float(value.strip().replace(",", "").lstrip("$"))
+        except ValueError:
+            return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if value != value or value in (float("inf"), float("-inf")):
+        return None
+    return repr(value)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+
+
+def chart_data(values, names):
+    """Return ``(categories, series)`` for the values of a chart's bound columns.
+
+    ``series`` is a list of ``(name, values)``; a name of None keeps the
+    template series' own name.
+    """
+    if len(values) == 1:
+        value = values[0]
+        if hasattr(value, "columns"):
+            # DataFrame: one series per column over the index
+            return value.index.tolist(), [(str(col), value[col].tolist()) for col in value.columns]
+        if hasattr(value, "tolist") and hasattr(value, "index"):
+            # Series
+            name = names[0] if value.name is None else str(value.name)
+            return value.index.tolist(), [(name, value.tolist())]
+        if isinstance(value, dict):
+            return list(value), [(names[0], list(value.values()))]
+        if isinstance(value, (list, tuple)):
+            return [pair[0] for pair in value], [(names[0], [pair[1] for pair in value])]
+    return list(names), [(None, list(values))]
+
+
+class _Series:
+    """One template series split into literal chunks around data slots."""
+
+    def __init__(self, text, kinds, name, format_code):
+        self.chunks, indexes = split_slots(text)
+        self.slots = [kinds[i] for i in indexes]
+        self.name = name
+        self.format_code = format_code
+
+
+class ChartTemplate:
+    """A chart part compiled for rendering series data as literal caches.
+
+    ``xml`` is the chart without its workbook link and ``rels`` its
+    relationships without the workbook (None if nothing else is left).
+    """
+
+    def __init__(self, xml, rels=None):
+        root = etree.fromstring(xml)
+        external = root.find("c:externalData", NS)
+        if external is not None:
+            rid = external.get(f"{{{R_NS}}}id")
+            root.remove(external)
+            if rels is not None:
+                rels = etree.fromstring(rels)
+                for rel in rels:
+                    if rel.get("Id") == rid:
+                        rels.remove(rel)
+                rels = serialize(rels) if len(rels) else None
+        self.rels = rels
+        self.xml = serialize(root)
+
+        p = f"{root.prefix}:" if root.prefix else ""
+        self._v, self._pt, self._count = f"{p}v", f"{p}pt", f"{p}ptCount"
+        self._str_lit, self._num_lit, self._format = f"{p}strLit", f"{p}numLit", f"{p}formatCode"
+
+        sers = root.findall("c:chart/c:plotArea/*/c:ser", NS)
+        if not sers:
+            raise ValueError("Chart has no series to bind data to")
+        kinds = []
+        info = []
+
+        def data_slot(kind):
+            kinds.append(kind)
+            return slot(len(kinds) - 1)
+
+        for ser in sers:
+            info.append((
+                ser.findtext("c:tx//c:v", None, NS),
+                ser.findtext("c:val//c:formatCode", None, NS)
+                or ser.findtext("c:yVal//c:formatCode", None, NS)
+                or "General",
+            ))
+            for kind in ("idx", "order"):
+                elem = ser.find(f"c:{kind}", NS)
+                if elem is not None:
+                    elem.set("val", data_slot(kind))
+            for kind, tags in _DATA_TAGS.items():
+                for tag in tags:
+                    elem = ser.find(f"c:{tag}", NS)
+                    if elem is not None:
+                        for child in list(elem):
+                            elem.remove(child)
+                        elem.text = data_slot(kind)
+            mark_region(ser)
+
+        pieces = split_regions(serialize(root).decode("utf-8"))
+        self._chunks = pieces[0::2]
+        self._series = [_Series(text, kinds, *meta) for text, meta in zip(pieces[1::2], info)]
+
+    def _categories(self, categories):
+        n = len(categories)
+        if n and all(map(_is_number, categories)):
+            points = "".join(
+                f'<{self._pt} idx="{i}"><{self._v}>{_number(c)}</{self._v}></{self._pt}>'
+                for i, c in enumerate(categories)
+            )
+            return (
+                f"<{self._num_lit}><{self._format}>General</{self._format}>"
+                f'<{self._count} val="{n}"/>{points}</{self._num_lit}>'
+            )
+        points = "".join(
+            f'<{self._pt} idx="{i}"><{self._v}>{escape(cell_text(c))}</{self._v}></{self._pt}>'
+            for i, c in enumerate(categories)
+        )
+        return f'<{self._str_lit}><{self._count} val="{n}"/>{points}</{self._str_lit}>'
+
+    def _values(self, values, format_code):
+        points = "".join(
+            f'<{self._pt} idx="{i}"><{self._v}>{text}</{self._v}></{self._pt}>'
+            for i, text in enumerate(map(_number, values))
+            if text is not None
+        )
+        return (
+            f"<{self._num_lit}><{self._format}>{escape(format_code)}</{self._format}>"
+            f'<{self._count} val="{len(values)}"/>{points}</{self._num_lit}>'
+        )
+
+    def render_data(self, categories, series):
+        """Return the chart XML for ``categories`` and ``[(name, values), ...]``."""
+        cat = self._categories(categories)
+        last = len(self._series) - 1
+        rendered = [[] for _ in self._series]
+        for i, (name, values) in enumerate(series):
+            template = self._series[min(i, last)]
+            if name is None:
+                name = template.name or ""
+            fill = {
+                "idx": str(i),
+                "order": str(i),
+                "tx": f"<{self._v}>{escape(str(name))}</{self._v}>",
+                "cat": cat,
+                "val": self._values(values, template.format_code),
+            }
+            chunks = template.chunks
+            out = [chunks[0]]
+            for j, kind in enumerate(template.slots, 1):
+                out.append(fill[kind])
+                out.append(chunks[j])
+            rendered[min(i, last)].append("".join(out))
+        out = [self._chunks[0]]
+        for i, series_xml in enumerate(rendered, 1):
+            out.extend(series_xml)
+            out.append(self._chunks[i])
+        return "".join(out).encode("utf-8")
+
+    def render(self, values, names):
+        """Return the chart XML for the values of its bound columns ``names``."""
+        return self.render_data(*chart_data(values, names))
+
+
+def add_bound_charts(slide, charts, left, top, width, height):
+    """Stack charts bound to columns in a box on a python-pptx slide.
+
+    ``charts`` lists ``(column, chart type, number format)`` with the
+    chart type named as in ``XL_CHART_TYPE``. Each chart gets two dummy
+    points and ``{column}`` as its alt text, so rendering fills it.
+    """
+    from pptx.chart.data import CategoryChartData
+    from pptx.enum.chart import XL_CHART_TYPE
+
+    chart_height = (height - CHART_GAP_EMU * (len(charts) - 1)) // len(charts)
+    for i, (column, chart_type, number_format) in enumerate(charts):
+        data = CategoryChartData()
+        data.categories = ["A", "B"]
+        data.add_series(column, (1, 1), number_format)
+        frame = slide.shapes.add_chart(
+            getattr(XL_CHART_TYPE, chart_type), left, top + i * (chart_height + CHART_GAP_EMU),
+            width, chart_height, data,
+        )
+        frame._element.nvGraphicFramePr.cNvPr.set("descr", "{" + column + "}")
+
+
+def _literal_points(lit):
+    return {int(pt.get("idx")): pt.findtext("c:v", "", NS) for pt in lit.iterfind("c:pt", NS)}
+
+
+def _column(index):
+    name = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        name = chr(65 + rem) + name
+    return name
+
+
+def _workbook(chart):
+    """Move a chart's literal caches into a new workbook.
+
+    Returns the workbook bytes, or None when the chart holds no literals.
+    The literals become references into the workbook's first sheet with
+    the same values cached, as PowerPoint writes them.
+    """
+    from openpyxl import Workbook
+
+    sers = chart.findall("c:chart/c:plotArea/*/c:ser", NS)
+    if not any(ser.find("*/c:numLit", NS) is not None or ser.find("*/c:strLit", NS) is not None for ser in sers):
+        return None
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Sheet1"
+    c = f"{{{C_NS}}}"
+    written = set()  # every series shares the category column
+    for i, ser in enumerate(sers):
+        col = _column(i + 1)
+        tx = ser.find("c:tx", NS)
+        if tx is not None and tx.find("c:v", NS) is not None:
+            name = tx.findtext("c:v", "", NS)
+            tx.remove(tx.find("c:v", NS))
+            sheet[f"{col}1"] = name
+            ref = etree.SubElement(tx, c + "strRef")
+            etree.SubElement(ref, c + "f").text = f"Sheet1!${col}$1"
+            cache = etree.SubElement(ref, c + "strCache")
+            etree.SubElement(cache, c + "ptCount", val="1")
+            etree.SubElement(etree.SubElement(cache, c + "pt", idx="0"), c + "v").text = name
+        for tags, column in ((_DATA_TAGS["cat"], "A"), (_DATA_TAGS["val"], col)):
+            for tag in tags:
+                elem = ser.find(f"c:{tag}", NS)
+                lit = None if elem is None else elem[0] if len(elem) else None
+                if lit is None or lit.tag not in (c + "strLit", c + "numLit"):
+                    continue
+                points = _literal_points(lit)
+                count = int(lit.find("c:ptCount", NS).get("val", len(points)))
+                numeric = lit.tag == c + "numLit"
+                if column not in written:
+                    written.add(column)
+                    for idx, text in points.items():
+                        sheet[f"{column}{idx + 2}"] = float(text) if numeric else text
+                kind = "num" if numeric else "str"
+                ref = etree.Element(c + f"{kind}Ref")
+                etree.SubElement(ref, c + "f").text = f"Sheet1!${column}$2:${column}${count + 1}"
+                lit.tag = c + f"{kind}Cache"
+                ref.append(lit)
+                elem.append(ref)
+    buf = io.BytesIO()
+    workbook.save(buf)
+    return buf.getvalue()
+
+
+def _link_workbook(chart, rels, target):
+    """Point ``chart`` at an embedded workbook through a new relationship."""
+    rids = {rel.get("Id") for rel in rels}
+    n = len(rids) + 1
+    while f"rId{n}" in rids:
+        n += 1
+    rid = f"rId{n}"
+    etree.SubElement(rels, f"{{{PKG_REL_NS}}}Relationship", Id=rid, Type=RT_PACKAGE, Target=target)
+    external = etree.Element(f"{{{C_NS}}}externalData", {f"{{{R_NS}}}id": rid})
+    etree.SubElement(external, f"{{{C_NS}}}autoUpdate", val="0")
+    following = [chart.find(f"c:{tag}", NS) for tag in _AFTER_EXTERNAL_DATA]
+    following = [elem for elem in following if elem is not None]
+    if following:
+        following[0].addprevious(external)
+    else:
+        chart.append(external)
+
+
+def embed_workbooks(path, output=None):
+    """Give every chart with literal caches an embedded workbook.
+
+    The deck at ``path`` is rewritten (or written to ``output``) with one
+    new workbook per such chart; all other parts are copied without being
+    recompressed. Returns the number of workbooks added.
+    """
+    output = output or path
+    with zipfile.ZipFile(path) as zin:
+        names = set(zin.namelist())
+        content_types = etree.fromstring(zin.read(CONTENT_TYPES))
+        charts = [
+            override.get("PartName").lstrip("/")
+            for override in content_types.iterfind("ct:Override", NS)
+            if override.get("ContentType") == CT_CHART
+        ]
+        updated = {}
+        number = 1
+        for partname in charts:
+            chart = etree.fromstring(zin.read(partname))
+            if chart.find("c:externalData", NS) is not None:
+                continue
+            data = _workbook(chart)
+            if data is None:
+                continue
+            while f"ppt/embeddings/Microsoft_Excel_Worksheet{number}.xlsx" in names:
+                number += 1
+            workbook = f"ppt/embeddings/Microsoft_Excel_Worksheet{number}.xlsx"
+            names.add(workbook)
+            chart_rels = rels_path(partname)
+            if chart_rels in names:
+                rels = etree.fromstring(updated.get(chart_rels) or zin.read(chart_rels))
+            else:
+                rels = etree.Element(f"{{{PKG_REL_NS}}}Relationships", nsmap={None: PKG_REL_NS})
+            _link_workbook(chart, rels, posixpath.relpath(workbook, posixpath.dirname(partname)))
+            updated[partname] = serialize(chart)
+            updated[chart_rels] = serialize(rels)
+            updated[workbook] = data
+        if not updated:
+            if output != path:
+                shutil.copyfile(path, output)
+            return 0
+
+        if content_types.find("ct:Default[@Extension='xlsx']", NS) is None:
+            etree.SubElement(content_types, f"{{{CT_NS}}}Default", Extension="xlsx", ContentType=CT_XLSX)
+        directory = os.path.dirname(os.path.abspath(output))
+        fd, tmp_path = tempfile.mkstemp(suffix=".pptx", dir=directory)
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zout:
+                zout.writestr(CONTENT_TYPES, serialize(content_types))
+                for info in zin.infolist():
+                    if info.filename == CONTENT_TYPES or info.filename in updated:
+                        continue
+                    copy_member(zin, zout, info)
+                for name, data in updated.items():
+                    # Workbooks are zips already
+                    compress_type = zipfile.ZIP_STORED if name.endswith(".xlsx") else zipfile.ZIP_DEFLATED
+                    zout.writestr(name, data, compress_type=compress_type)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, output)
+    return sum(1 for name in updated if name.endswith(".xlsx"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed workbooks for charts rendered with literal data")
+    parser.add_argument("deck", help="Path to the generated .pptx")
+    parser.add_argument("--output", default=None, help="Write here instead of replacing the deck")
+    args = parser.parse_args()
+    count = embed_workbooks(args.deck, args.output)
+    print(f"Embedded {count} chart workbook(s) in {args.output or args.deck}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Files, hashing and eviction shared by the on-disk caches.
+
+``sheetcache`` and ``templatecache`` each keep their entries as files in
+a directory of their own under ``~/.cache/pptgen``. Entries are written
+atomically, so a reader never sees half an entry, and the least recently
+used ones (by mtime) are evicted once a directory grows past its limit.
+
+    PPTGEN_NO_CACHE=1     turns every cache off
+"""
+
+import hashlib
+import os
+
+
+def enabled():
+    return os.environ.get("PPTGEN_NO_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def cache_dir(env_var, name):
+    """Return the directory of cache ``name``, unless ``env_var`` moves it."""
+    default = os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "pptgen", name,
+    )
+    return os.environ.get(env_var) or default
+
+
+def max_bytes(env_var, default_mb):
+    return int(os.environ.get(env_var, default_mb)) * 2**20
+
+
+def file_hash(path):
+    """Return the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path, data):
+    """Write ``data`` to ``path`` through a temporary file beside it."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def touch(path):
+    """Mark an entry as recently used for eviction; failures are ignored."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def evict(directory, limit, suffixes):
+    """Remove least recently used entries until the cache fits in ``limit`` bytes.
+
+    Only files ending in one of ``suffixes`` count as entries.
+    """
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(suffixes):
+            st = os.stat(os.path.join(directory, name))
+            entries.append((st.st_mtime, st.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= limit:
+            break
+        os.remove(os.path.join(directory, name))
+        total -= size
+
+
+def clear(directory, suffixes):
+    """Remove every file ending in one of ``suffixes`` from a cache directory."""
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith(suffixes):
+                os.remove(os.path.join(directory, name))
@@ -0,0 +1,876 @@
+"""XML-level slide rendering.
+
+The template slide part is serialized once and split into literal chunks
+and placeholder slots. Each row's slide part is produced by joining those
+chunks with escaped values, and the deck is written at the zip level so
+every shape type (tables, pictures, groups, charts) survives unchanged.
+
+A table row whose cells use ``{*column}`` tokens repeats once per record;
+rows that do not fit on the slide continue on further slides.
+
+Every template slide is compiled. By default only the first is rendered
+per row; ``route_rows`` instead sends each row to the slides of the
+section named by one of its columns, and slides without placeholders
+are kept once as static sections.
+
+Charts whose alt text holds ``{column}`` tokens are bound to those
+columns and rendered the same way (see ``charts``).
+"""
+
+import copy
+import hashlib
+import os
+import posixpath
+import re
+import zipfile
+from itertools import islice
+
+from lxml import etree
+
+from formatting import ValueFormat, split_token
+from ingest import cell_text
+from opc import (
+    CONTENT_TYPES,
+    PRESENTATION_MAIN_CT,
+    TEMPLATE_MAIN_CT,
+    CompressedPart,
+    compress,
+    copy_member,
+    write_compressed,
+)
+
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+P14_NS = "http://schemas.microsoft.com/office/powerpoint/2010/main"
+C_NS = "http://schemas.openxmlformats.org/drawingml/2006/chart"
+NS = {"a": A_NS, "p": P_NS, "r": R_NS, "rel": PKG_REL_NS, "ct": CT_NS, "p14": P14_NS, "c": C_NS}
+
+RT_OFFICE_DOCUMENT = R_NS + "/officeDocument"
+RT_SLIDE = R_NS + "/slide"
+RT_NOTES_SLIDE = R_NS + "/notesSlide"
+RT_COMMENTS = R_NS + "/comments"
+RT_CHART = R_NS + "/chart"
+CT_SLIDE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+
+DEFAULT_SLIDE_HEIGHT = 6858000  # 7.5in in EMU
+PAGE_MARGIN_EMU = 457200  # keep repeating tables 0.5in above the slide's bottom edge
+
+# Relationships that belong to exactly one slide and are not carried to clones
+UNSHARED_RELTYPES = {RT_NOTES_SLIDE, RT_COMMENTS}
+# Parts only one slide may reference; each generated slide gets its own copy
+PER_SLIDE_RELTYPES = {RT_CHART, "http://schemas.microsoft.com/office/2014/relationships/chartEx"}
+# Parts under these folders are deduplicated by content
+SHARED_MEDIA_DIRS = ("ppt/media/", "ppt/embeddings/")
+
+PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+# A table row holding one of these is repeated once per record
+_REPEAT_RE = re.compile(r"\{\*[^{}]+\}")
+_INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+# Slots are marked with private-use characters that never occur in templates
+_SLOT_OPEN, _SLOT_CLOSE = "\ue000", "\ue001"
+_SLOT_RE = re.compile(_SLOT_OPEN + r"(\d+)" + _SLOT_CLOSE)
+_REGION_OPEN, _REGION_CLOSE = "\ue002", "\ue003"
+_REGION_RE = re.compile(f"[{_REGION_OPEN}{_REGION_CLOSE}]")
+_SLIDE_NAME_RE = re.compile(r"slide(\d+)\.xml$")
+_NUMBERED_PART_RE = re.compile(r"^(.*?)(\d*)(\.[^./]+)$")
+_SHAPE_TAGS = [f"{{{P_NS}}}{tag}" for tag in ("sp", "pic", "graphicFrame", "grpSp", "cxnSp")]
+
+
+def escape(text):
+    """Escape ``text`` for an XML text node, dropping characters XML forbids."""
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return _INVALID_XML_RE.sub("", text)
+
+
+def rels_path(partname):
+    """Return the relationships part name for ``partname``."""
+    directory, name = posixpath.split(partname)
+    return posixpath.join(directory, "_rels", name + ".rels")
+
+
+def resolve(source, target):
+    """Resolve a relationship ``target`` relative to the ``source`` part."""
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source), target))
+
+
+def serialize(element):
+    return etree.tostring(element, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def rels_source(rels_name):
+    """Return the part a relationships part belongs to ("" for the package)."""
+    directory, name = posixpath.split(rels_name)
+    return posixpath.join(posixpath.dirname(directory), name[: -len(".rels")])
+
+
+def _dedupe_media(zin, names):
+    """Map duplicate media parts to the first part with the same content.
+
+    Returns ``(aliases, rewritten)`` where ``rewritten`` holds the
+    relationships parts whose targets had to be pointed at the survivors.
+    """
+    aliases = {}
+    seen = {}
+    for name in sorted(names):
+        if name.startswith(SHARED_MEDIA_DIRS):
+            digest = hashlib.sha256(zin.read(name)).digest()
+            aliases[name] = seen.setdefault(digest, name)
+    aliases = {name: kept for name, kept in aliases.items() if name != kept}
+    if not aliases:
+        return {}, {}
+
+    rewritten = {}
+    for rels_name in names:
+        if not rels_name.endswith(".rels"):
+            continue
+        source = rels_source(rels_name)
+        rels = etree.fromstring(zin.read(rels_name))
+        changed = False
+        for rel in rels:
+            if rel.get("TargetMode") == "External":
+                continue
+            target = resolve(source, rel.get("Target")).lstrip("/")
+            if target in aliases:
+                rel.set("Target", posixpath.relpath(aliases[target], posixpath.dirname(source) or "."))
+                changed = True
+        if changed:
+            rewritten[rels_name] = serialize(rels)
+    return aliases, rewritten
+
+
+def _merge_split_tokens(paragraph):
+    # PowerPoint often splits "{Project Name}" across several runs; move each
+    # token into the run where it starts so it can be found in one text node.
+    nodes = paragraph.findall("./a:r/a:t", NS)
+    if len(nodes) < 2:
+        return
+    offsets = []
+    pos = 0
+    for node in nodes:
+        offsets.append(pos)
+        pos += len(node.text or "")
+    full = "".join(node.text or "" for node in nodes)
+
+    def node_at(offset):
+        for i in range(len(nodes) - 1, -1, -1):
+            if offsets[i] <= offset:
+                return i
+        return 0
+
+    for match in reversed(list(PLACEHOLDER_RE.finditer(full))):
+        first = node_at(match.start())
+        last = node_at(match.end() - 1)
+        if first == last:
+            continue
+        split = match.end() - offsets[last]
+        tail = nodes[last].text or ""
+        nodes[first].text = (nodes[first].text or "") + "".join(
+            nodes[i].text or "" for i in range(first + 1, last)
+        ) + tail[:split]
+        for i in range(first + 1, last):
+            nodes[i].text = ""
+        nodes[last].text = tail[split:]
+
+
+def slot(index):
+    """Return the marker for slot ``index``, to be put in an element's text."""
+    return f"{_SLOT_OPEN}{index}{_SLOT_CLOSE}"
+
+
+def split_slots(text):
+    """Split text at its slot markers into ``(chunks, slot indexes)``."""
+    parts = _SLOT_RE.split(text)
+    return parts[0::2], [int(i) for i in parts[1::2]]
+
+
+def mark_region(element):
+    """Mark ``element`` as a region that ``split_regions`` cuts out."""
+    prev = element.getprevious()
+    if prev is None:
+        parent = element.getparent()
+        parent.text = (parent.text or "") + _REGION_OPEN
+    else:
+        prev.tail = (prev.tail or "") + _REGION_OPEN
+    element.tail = _REGION_CLOSE + (element.tail or "")
+
+
+def split_regions(text):
+    """Split serialized XML into the text around and inside its marked regions.
+
+    Returns ``[before, region, between, region, ..., after]``.
+    """
+    return _REGION_RE.split(text)
+
+
+class Skeleton:
+    """Serialized XML split into literal chunks around placeholder slots.
+
+    ``names`` maps each slot index to the name its value is looked up by.
+    """
+
+    def __init__(self, text, names):
+        self.chunks, indexes = split_slots(text)
+        self.slots = [names[i] for i in indexes]
+        # Tokens with no matching column are left in the slide verbatim
+        self._fallback = {name: escape("{" + name + "}") for name in self.slots}
+
+    def render(self, values):
+        chunks = self.chunks
+        fallback = self._fallback
+        out = [chunks[0]]
+        for i, name in enumerate(self.slots, 1):
+            val = values.get(name)
+            out.append(fallback[name] if val is None else escape(val))
+            out.append(chunks[i])
+        return "".join(out)
+
+
+def _rows_per_page(tr, slide_height):
+    # How many copies of the repeating row fit between the table's top edge
+    # and the bottom margin, after the table's fixed rows
+    row_height = int(tr.get("h", "0"))
+    frame = next(tr.iterancestors(f"{{{P_NS}}}graphicFrame"), None)
+    if not row_height or frame is None:
+        return None
+    off = frame.find("p:xfrm/a:off", NS)
+    top = int(off.get("y", "0")) if off is not None else 0
+    fixed = sum(int(row.get("h", "0")) for row in tr.getparent().iterfind("a:tr", NS) if row is not tr)
+    return max(1, (slide_height - top - PAGE_MARGIN_EMU - fixed) // row_height)
+
+
+def _chart_bindings(root):
+    # {chart relationship id: bound columns} from each chart's alt text,
+    # or its name when the alt text holds no tokens
+    bindings = {}
+    for frame in root.iter(f"{{{P_NS}}}graphicFrame"):
+        c_nv_pr = frame.find("p:nvGraphicFramePr/p:cNvPr", NS)
+        chart = frame.find("a:graphic/a:graphicData/c:chart", NS)
+        if c_nv_pr is None or chart is None:
+            continue
+        tokens = PLACEHOLDER_RE.findall(c_nv_pr.get("descr", "")) or PLACEHOLDER_RE.findall(c_nv_pr.get("name", ""))
+        if tokens:
+            bindings[chart.get(f"{{{R_NS}}}id")] = [split_token(token)[0] for token in tokens]
+    return bindings
+
+
+class SlideTemplate:
+    """A slide part pre-split into literal chunks and placeholder slots.
+
+    A table row holding ``{*column}`` tokens is a repeating region: it is
+    rendered once per record of a page, and ``rows_per_page`` records fit
+    on one slide. ``charts`` maps the relationship id of each bound chart
+    to the columns it is bound to.
+    """
+
+    def __init__(self, xml, slide_height=DEFAULT_SLIDE_HEIGHT):
+        root = etree.fromstring(xml)
+        c_sld = root.find("p:cSld", NS)
+        self.name = "" if c_sld is None else c_sld.get("name", "")
+        self.charts = _chart_bindings(root)
+        for paragraph in root.iter(f"{{{A_NS}}}p"):
+            _merge_split_tokens(paragraph)
+
+        repeat_rows = [
+            tr for tr in root.iter(f"{{{A_NS}}}tr")
+            if any(t.text and _REPEAT_RE.search(t.text) for t in tr.iter(f"{{{A_NS}}}t"))
+        ]
+        if len(repeat_rows) > 1:
+            raise ValueError("Only one repeating table row per slide is supported")
+        self.rows_per_page = None
+        if repeat_rows:
+            tr = repeat_rows[0]
+            self.rows_per_page = _rows_per_page(tr, slide_height)
+            mark_region(tr)
+
+        names = []
+
+        def mark(match):
+            names.append(match.group(1).lstrip("*"))
+            return slot(len(names) - 1)
+
+        for node in root.iter(f"{{{A_NS}}}t"):
+            if node.text and "{" in node.text:
+                node.text = PLACEHOLDER_RE.sub(mark, node.text)
+
+        text = serialize(root).decode("utf-8")
+        if repeat_rows:
+            head, row, tail = split_regions(text)
+            self._head = Skeleton(head, names)
+            self._row = Skeleton(row, names)
+            self._tail = Skeleton(tail, names)
+            self.slots = self._head.slots + self._row.slots + self._tail.slots
+        else:
+            self._head = Skeleton(text, names)
+            self._row = self._tail = None
+            self.slots = self._head.slots
+        # Slots named "column:spec" are filled from column through a
+        # ValueFormat, unless the data has a column of the whole name
+        self.slot_columns = [split_token(name)[0] for name in self.slots]
+        self._formats = {
+            name: (column, ValueFormat(spec))
+            for name, (column, spec) in zip(self.slots, map(split_token, self.slots))
+            if spec is not None
+        }
+        self.placeholders = list(dict.fromkeys(
+            self.slot_columns + list(self._formats) + [name for names in self.charts.values() for name in names]
+        ))
+        self.shape_count = sum(1 for _ in root.iter(*_SHAPE_TAGS))
+
+    @property
+    def repeats(self):
+        return self._row is not None
+
+    def render(self, values, records=()):
+        """Return the slide XML; ``values`` maps names to text.
+
+        For a repeating table, ``records`` holds one such mapping per table
+        row and the whole region is expanded in a single join.
+        """
+        if self._row is None:
+            return self._head.render(values).encode("utf-8")
+        row = self._row.render
+        return "".join(
+            [self._head.render(values), *[row(record) for record in records], self._tail.render(values)]
+        ).encode("utf-8")
+
+    def record(self, columns, row):
+        """Return the text for every slot of this slide from one data row."""
+        record = dict(zip(columns, map(cell_text, row)))
+        if self._formats:
+            raw = dict(zip(columns, row))
+            for name, (column, fmt) in self._formats.items():
+                if name not in raw and column in raw:
+                    record[name] = fmt(raw[column])
+        return record
+
+    def render_rows(self, columns, rows):
+        """Render one slide from a list of data rows (one row unless repeating)."""
+        records = [self.record(columns, row) for row in rows]
+        if self._row is None:
+            return self.render(records[0])
+        # Scalar placeholders on a repeating slide take the page's first row
+        return self.render(records[0] if records else {}, records)
+
+    def paginate(self, rows):
+        """Group data rows into the row lists that each become one slide."""
+        if self._row is None:
+            return ([row] for row in rows)
+        if self.rows_per_page is None:
+            return iter([list(rows)])
+        rows = iter(rows)
+        return iter(lambda: list(islice(rows, self.rows_per_page)), [])
+
+
+class SlidePart:
+    """One compiled template slide and the parts its generated copies need.
+
+    ``name`` is the slide's section name: its ``p:cSld`` name, or else the
+    PowerPoint section it sits in. ``owned_parts`` lists the notes and
+    comments parts (and their relationships) that belong to this slide only.
+    ``charts`` maps the relationship target of each bound chart to
+    ``(partname, columns, ChartTemplate)``.
+    """
+
+    def __init__(self, partname, name, template, clone_rels, per_slide_parts, owned_parts, charts=None):
+        self.partname = partname
+        self.name = name
+        self.template = template
+        self.clone_rels = clone_rels
+        self.per_slide_parts = per_slide_parts
+        self.owned_parts = owned_parts
+        self.charts = charts or {}
+
+    @property
+    def static(self):
+        """True for slides without placeholders, which are emitted once as they are."""
+        return not (self.template.slots or self.charts)
+
+    @property
+    def chart_parts(self):
+        """The bound chart parts and their relationships."""
+        return [name for part, _, _ in self.charts.values() for name in (part, rels_path(part))]
+
+    @property
+    def members(self):
+        """The slide part, its relationships and every part it owns."""
+        return [self.partname, rels_path(self.partname), *self.owned_parts, *self.chart_parts]
+
+    def render_charts(self, columns, rows):
+        """Return ``{target: chart XML}`` for the bound charts from a page's first row.
+
+        Charts bound to columns missing from the data keep the template's values.
+        """
+        if not self.charts or not rows:
+            return {}
+        values = dict(zip(columns, rows[0]))
+        return {
+            target: chart.render([values.get(name) for name in names], names)
+            for target, (_, names, chart) in self.charts.items()
+            if any(name in values for name in names)
+        }
+
+
+def _section_names(presentation):
+    # PowerPoint's own sections, by slide id
+    names = {}
+    for section in presentation.iter(f"{{{P14_NS}}}section"):
+        for sld_id in section.iterfind("p14:sldIdLst/p14:sldId", NS):
+            names[sld_id.get("id")] = section.get("name", "")
+    return names
+
+
+class TemplatePackage:
+    """Everything needed from a .pptx/.potx template to write decks from it."""
+
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path) as zin:
+            names = set(zin.namelist())
+            self.content_types = etree.fromstring(zin.read(CONTENT_TYPES))
+            for override in self.content_types.iterfind("ct:Override", NS):
+                if override.get("ContentType") == TEMPLATE_MAIN_CT.decode():
+                    override.set("ContentType", PRESENTATION_MAIN_CT.decode())
+
+            root_rels = etree.fromstring(zin.read("_rels/.rels"))
+            main = next(
+                rel.get("Target") for rel in root_rels if rel.get("Type") == RT_OFFICE_DOCUMENT
+            )
+            self.presentation_part = main.lstrip("/")
+            self.presentation = etree.fromstring(zin.read(self.presentation_part))
+            self.presentation_rels = etree.fromstring(zin.read(rels_path(self.presentation_part)))
+
+            rels = {rel.get("Id"): rel.get("Target") for rel in self.presentation_rels}
+            sld_id_lst = self.presentation.find("p:sldIdLst", NS)
+            sld_ids = [] if sld_id_lst is None else list(sld_id_lst)
+            if not sld_ids:
+                raise ValueError("Template has no slides")
+            self.slide_parts = [
+                resolve(self.presentation_part, rels[sld_id.get(f"{{{R_NS}}}id")])
+                for sld_id in sld_ids
+            ]
+            self.slide_numbers = [
+                int(m.group(1)) for m in map(_SLIDE_NAME_RE.search, names) if m
+            ]
+            sld_sz = self.presentation.find("p:sldSz", NS)
+            slide_height = DEFAULT_SLIDE_HEIGHT if sld_sz is None else int(sld_sz.get("cy"))
+
+            # Identical images and embeddings are stored once; relationships
+            # that pointed at a duplicate are rewritten to the kept copy
+            self.aliases, self.rewritten_parts = _dedupe_media(zin, names)
+            for override in list(self.content_types.iterfind("ct:Override", NS)):
+                if override.get("PartName").lstrip("/") in self.aliases:
+                    self.content_types.remove(override)
+            content_types = {
+                override.get("PartName").lstrip("/"): override.get("ContentType")
+                for override in self.content_types.iterfind("ct:Override", NS)
+            }
+
+            def read(name):
+                return self.rewritten_parts.get(name) or zin.read(name)
+
+            sections = _section_names(self.presentation)
+            self.slides = []
+            for sld_id, partname in zip(sld_ids, self.slide_parts):
+                self.slides.append(self._compile_slide(
+                    zin, read, names, content_types, partname, sections.get(sld_id.get("id"), ""),
+                    slide_height,
+                ))
+            self.part_names = names
+
+    @staticmethod
+    def _compile_slide(zin, read, names, content_types, partname, section, slide_height):
+        template = SlideTemplate(zin.read(partname), slide_height)
+        name = template.name or section
+        slide_rels = rels_path(partname)
+        clone_rels = None
+        # (target, partname, content type, xml, rels) of the parts each
+        # generated slide needs its own copy of, e.g. charts
+        per_slide_parts = []
+        owned_parts = []
+        charts = {}
+        if slide_rels in names:
+            clone_rels = etree.fromstring(read(slide_rels))
+            for rel in list(clone_rels):
+                if rel.get("TargetMode") == "External":
+                    continue
+                target = rel.get("Target")
+                part = resolve(partname, target)
+                part_rels = rels_path(part)
+                if rel.get("Type") in UNSHARED_RELTYPES:
+                    clone_rels.remove(rel)
+                    owned_parts += [n for n in (part, part_rels) if n in names]
+                elif rel.get("Type") in PER_SLIDE_RELTYPES:
+                    xml = zin.read(part)
+                    part_rels = read(part_rels) if part_rels in names else None
+                    if rel.get("Type") == RT_CHART and rel.get("Id") in template.charts:
+                        from charts import ChartTemplate
+
+                        chart = ChartTemplate(xml, part_rels)
+                        charts[target] = (part, template.charts[rel.get("Id")], chart)
+                        # Clones get the chart without its workbook link
+                        xml, part_rels = chart.xml, chart.rels
+                    per_slide_parts.append((target, part, content_types.get(part), xml, part_rels))
+            clone_rels = serialize(clone_rels)
+        return SlidePart(partname, name, template, clone_rels, per_slide_parts, owned_parts, charts)
+
+    @property
+    def sections(self):
+        """Slides with placeholders grouped by section name, in template order."""
+        sections = {}
+        for slide in self.slides:
+            if not slide.static:
+                sections.setdefault(slide.name, []).append(slide)
+        return sections
+
+    @property
+    def section_placeholders(self):
+        """Every column referenced by any section slide."""
+        return list(dict.fromkeys(
+            name for slide in self.slides for name in slide.template.placeholders
+        ))
+
+    @property
+    def placeholders(self):
+        """Columns of the first slide, the one rendered for every row unless rows are routed."""
+        return self.slides[0].template.placeholders
+
+    # lxml elements do not pickle; ship them to worker processes as bytes
+    _XML_STATE = ("content_types", "presentation", "presentation_rels")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in self._XML_STATE:
+            state[key] = etree.tostring(state[key])
+        return state
+
+    def __setstate__(self, state):
+        for key in self._XML_STATE:
+            state[key] = etree.fromstring(state[key])
+        self.__dict__.update(state)
+
+
+def route_rows(package, columns, rows, route_by, stats=None):
+    """Yield ``(slide, xml, charts)`` for data rows routed to template sections.
+
+    Each row goes to the section named by its ``route_by`` value, or to the
+    section named ``*`` when none matches, and is rendered by every slide of
+    that section. A slide with a repeating table collects its section's rows
+    and yields a slide each time a page fills up. Rows that match no section
+    are skipped and counted in ``stats["unrouted"]``. The column and the
+    template's sections are checked when this is called, before any row
+    is read.
+    """
+    if route_by not in columns:
+        raise ValueError(f"Route-by column not found: {route_by}")
+    sections = package.sections
+    if "" in sections:
+        number = package.slides.index(sections[""][0]) + 1
+        raise ValueError(f"Template slide {number} has placeholders but no section name to route rows to")
+    return _route(package, columns, rows, columns.index(route_by), stats)
+
+
+def _route(package, columns, rows, key, stats):
+    sections = package.sections
+    fallback = sections.get("*")
+    pages = {}
+    unrouted = 0
+    for row in rows:
+        slides = sections.get(cell_text(row[key]).strip(), fallback)
+        if slides is None:
+            unrouted += 1
+            continue
+        for slide in slides:
+            template = slide.template
+            if not template.repeats:
+                yield slide, template.render_rows(columns, [row]), slide.render_charts(columns, [row])
+                continue
+            page = pages.setdefault(slide.partname, [])
+            page.append(row)
+            if len(page) == template.rows_per_page:
+                yield slide, template.render_rows(columns, page), slide.render_charts(columns, page)
+                page.clear()
+    for slide in package.slides:
+        page = pages.get(slide.partname)
+        if page:
+            yield slide, slide.template.render_rows(columns, page), slide.render_charts(columns, page)
+    if stats is not None:
+        stats["unrouted"] = unrouted
+
+
+class DeckWriter:
+    """Stream a deck built from a template package into ``output``.
+
+    Template parts are copied as soon as the writer opens and each slide
+    part is written the moment it is added, so memory stays flat however
+    many rows are rendered. The presentation part, its relationships and
+    ``[Content_Types].xml`` are finalized on close. A path ``output`` is
+    written through a temporary file beside it that replaces it only once
+    the deck is complete, so a failed run leaves the previous deck intact.
+
+    The first slide rendered from a template slide takes its place (keeping
+    its notes); the rest follow it as new slide parts. Without ``routed``
+    only the first template slide is rendered and any other template slides
+    come after the generated block unchanged. With ``routed`` every section
+    slide may be rendered: a section's slides are placed together, in the
+    order they were added, where the section first appears in the template,
+    and a section that got no slides is left out of the deck.
+    """
+
+    def __init__(self, package, output, routed=False):
+        self.package = package
+        self._routed = routed
+        self._output = output
+        self._tmp_path = None
+        if isinstance(output, (str, os.PathLike)):
+            self._tmp_path = f"{os.fspath(output)}.{os.getpid()}.tmp"
+            output = self._tmp_path
+        self._zin = zipfile.ZipFile(package.path)
+        self._zout = zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED)
+        self._next_number = max(package.slide_numbers, default=0) + 1
+        # Template slides rows may be rendered into, by part name
+        targets = [s for s in package.slides if not s.static] if routed else package.slides[:1]
+        self._targets = {slide.partname: slide for slide in targets}
+        self._used = set()
+        self._written = {}  # section -> slide part names in the order added
+        self._slide_count = 0
+        self._overrides = []
+        self._taken = set(package.part_names)
+        self._next_free = {}
+        self._clone_parts = {}
+        self._closed = False
+
+        self._finalized = {
+            CONTENT_TYPES,
+            package.presentation_part,
+            rels_path(package.presentation_part),
+        }
+        # A target slide's own parts are copied once it is used (or kept)
+        for slide in targets:
+            self._finalized.update(slide.members)
+        try:
+            for info in self._zin.infolist():
+                name = info.filename
+                if name in self._finalized or name in package.aliases:
+                    continue
+                self._copy(name)
+        except BaseException:
+            self.abort()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self):
+        """Stop writing and leave ``output`` as it was, if it is a path."""
+        self._closed = True
+        self._zout.close()
+        self._zin.close()
+        if self._tmp_path is not None and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    @property
+    def slide_count(self):
+        return self._slide_count
+
+    def _copy(self, name):
+        if name in self.package.rewritten_parts:
+            self._zout.writestr(name, self.package.rewritten_parts[name])
+        elif name in self._zin.NameToInfo:
+            copy_member(self._zin, self._zout, self._zin.getinfo(name))
+
+    def _write(self, name, data):
+        if isinstance(data, CompressedPart):
+            write_compressed(self._zout, name, data)
+        else:
+            self._zout.writestr(name, data)
+
+    def _section(self, slide):
+        return slide.name if self._routed else slide.partname
+
+    def add_slide(self, xml, slide=None, charts=None):
+        """Write one rendered slide part to the output and return its name.
+
+        ``xml`` is the slide XML, or a ``CompressedPart`` of it, and
+        ``slide`` the ``SlidePart`` it was rendered from (default: the
+        template's first slide). ``charts`` maps bound chart targets to
+        their rendered XML (or ``CompressedPart``); charts left out keep
+        the template's values.
+        """
+        slide = slide or self.package.slides[0]
+        charts = charts or {}
+        if slide.partname not in self._targets:
+            raise ValueError(f"Slide {slide.partname} is not rendered by this writer")
+        if slide.partname not in self._used:
+            self._used.add(slide.partname)
+            partname = slide.partname
+            chart_parts = set(slide.chart_parts)
+            for name in slide.members[1:]:
+                if name not in chart_parts:
+                    self._copy(name)
+            for target, (part, _, chart) in slide.charts.items():
+                self._write(part, charts.get(target, chart.xml))
+                if chart.rels is not None:
+                    self._zout.writestr(rels_path(part), chart.rels)
+        else:
+            partname = posixpath.join(posixpath.dirname(slide.partname), f"slide{self._next_number}.xml")
+            self._next_number += 1
+            self._write_clone_rels(partname, slide, charts)
+        self._write(partname, xml)
+        self._written.setdefault(self._section(slide), []).append(partname)
+        self._slide_count += 1
+        return partname
+
+    def _write_clone_rels(self, partname, slide, charts):
+        # Every clone carries the same relationships, so compress them once;
+        # per-slide parts (charts) get fresh copies while media stays shared
+        if slide.partname not in self._clone_parts:
+            self._clone_parts[slide.partname] = (
+                None if slide.clone_rels is None or slide.per_slide_parts else compress(slide.clone_rels),
+                [
+                    (target, source, content_type, compress(xml), None if rels is None else compress(rels))
+                    for target, source, content_type, xml, rels in slide.per_slide_parts
+                ],
+            )
+        clone_rels, per_slide = self._clone_parts[slide.partname]
+        if not per_slide:
+            if clone_rels is not None:
+                write_compressed(self._zout, rels_path(partname), clone_rels)
+            return
+
+        rels = slide.clone_rels
+        slide_dir = posixpath.dirname(partname)
+        for target, source, content_type, xml, part_rels in per_slide:
+            name = self._new_part_name(source)
+            self._write(name, charts.get(target, xml))
+            if part_rels is not None:
+                write_compressed(self._zout, rels_path(name), part_rels)
+            if content_type:
+                self._overrides.append((name, content_type))
+            new_target = posixpath.relpath(name, slide_dir)
+            rels = rels.replace(f'Target="{target}"'.encode(), f'Target="{new_target}"'.encode())
+        self._zout.writestr(rels_path(partname), rels)
+
+    def _new_part_name(self, partname):
+        stem, number, ext = _NUMBERED_PART_RE.match(partname).groups()
+        n = self._next_free.get((stem, ext), int(number or 1))
+        while f"{stem}{n}{ext}" in self._taken:
+            n += 1
+        self._next_free[stem, ext] = n + 1
+        name = f"{stem}{n}{ext}"
+        self._taken.add(name)
+        return name
+
+    def close(self):
+        """Finalize the package parts that depend on the full slide list."""
+        if self._closed:
+            return
+        self._closed = True
+        package = self.package
+        dropped = set()
+        for slide in self._targets.values():
+            if slide.partname in self._used:
+                continue
+            if self._routed:
+                dropped.update(slide.members)
+            else:
+                # No rows: the template slide is kept as it is
+                for name in slide.members:
+                    self._copy(name)
+
+        presentation = copy.deepcopy(package.presentation)
+        presentation_rels = copy.deepcopy(package.presentation_rels)
+        content_types = copy.deepcopy(package.content_types)
+
+        pres_dir = posixpath.dirname(package.presentation_part)
+        rels = {rel.get("Id"): rel for rel in presentation_rels}
+        next_rid = 1 + max(
+            (int(rid[3:]) for rid in rels if rid.startswith("rId") and rid[3:].isdigit()),
+            default=0,
+        )
+        sld_id_lst = presentation.find("p:sldIdLst", NS)
+        template_ids = list(sld_id_lst)
+        next_id = max(int(sld_id.get("id")) for sld_id in template_ids) + 1
+        template_parts = [
+            resolve(package.presentation_part, rels[sld_id.get(f"{{{R_NS}}}id")].get("Target"))
+            for sld_id in template_ids
+        ]
+        by_partname = dict(zip(template_parts, template_ids))
+        for sld_id in template_ids:
+            sld_id_lst.remove(sld_id)
+
+        # Rebuild the slide list in template order; each template slide id
+        # maps to the ids now standing in its place (for PowerPoint sections)
+        placed = {}
+        emitted = set()
+        for sld_id, partname in zip(template_ids, template_parts):
+            ids = placed[sld_id.get("id")] = []
+            slide = self._targets.get(partname)
+            if slide is None:
+                sld_id_lst.append(sld_id)
+                ids.append(sld_id.get("id"))
+                continue
+            section = self._section(slide)
+            if section not in emitted:
+                emitted.add(section)
+                for name in self._written.get(section, ()):
+                    new = by_partname.get(name)
+                    if new is None:
+                        rid = f"rId{next_rid}"
+                        new = etree.Element(f"{{{P_NS}}}sldId", {"id": str(next_id), f"{{{R_NS}}}id": rid})
+                        etree.SubElement(presentation_rels, f"{{{PKG_REL_NS}}}Relationship", {
+                            "Id": rid,
+                            "Type": RT_SLIDE,
+                            "Target": posixpath.relpath(name, pres_dir),
+                        })
+                        etree.SubElement(content_types, f"{{{CT_NS}}}Override", {
+                            "PartName": "/" + name,
+                            "ContentType": CT_SLIDE,
+                        })
+                        next_rid += 1
+                        next_id += 1
+                    sld_id_lst.append(new)
+                    ids.append(new.get("id"))
+            if partname in dropped:
+                presentation_rels.remove(rels[sld_id.get(f"{{{R_NS}}}id")])
+            elif partname not in self._used:
+                sld_id_lst.append(sld_id)
+                ids.append(sld_id.get("id"))
+        for partname, content_type in self._overrides:
+            etree.SubElement(content_types, f"{{{CT_NS}}}Override", {
+                "PartName": "/" + partname,
+                "ContentType": content_type,
+            })
+        if dropped:
+            for override in list(content_types.iterfind("ct:Override", NS)):
+                if override.get("PartName").lstrip("/") in dropped:
+                    content_types.remove(override)
+        _update_sections(presentation, placed)
+
+        self._zout.writestr(package.presentation_part, serialize(presentation))
+        self._zout.writestr(rels_path(package.presentation_part), serialize(presentation_rels))
+        self._zout.writestr(CONTENT_TYPES, serialize(content_types))
+        self._zout.close()
+        self._zin.close()
+        if self._tmp_path is not None:
+            os.replace(self._tmp_path, self._output)
+
+
+def _update_sections(presentation, placed):
+    # Keep PowerPoint's section list in step with the slide list: generated
+    # slides join the section of the template slide they came from
+    for sld_id in list(presentation.iter(f"{{{P14_NS}}}sldId")):
+        ids = placed.get(sld_id.get("id"))
+        if ids is None or ids == [sld_id.get("id")]:
+            continue
+        for new_id in ids:
+            sld_id.addprevious(etree.Element(f"{{{P14_NS}}}sldId", {"id": new_id}))
+        sld_id.getparent().remove(sld_id)
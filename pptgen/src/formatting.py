@@ -0,0 +1,99 @@
+"""Format specs in placeholders.
+
+A placeholder may carry a format spec after the first colon:
+
+    {Rev:$,.0f}            -> $1,234,567
+    {GP %:.1%}             -> 23.5%
+    {Date Signed:%Y-%m-%d} -> 2025-03-14
+
+Specs use Python's format mini-language, with a leading ``$`` for a
+currency prefix; a spec containing ``%`` directives is a strftime pattern.
+Each spec is compiled once per template and remembers the text it produced
+for each distinct value, so repeated values in a column are formatted once.
+"""
+
+import re
+from datetime import datetime
+
+from ingest import cell_text
+
+_STRFTIME_RE = re.compile(r"%[a-zA-Z]")
+_NUMBER_TYPES = set("bcdeEfFgGnoxX%")
+_INTEGER_TYPES = set("bcdoxX")
+# Columns with more distinct values than this stop being memoized
+_MEMO_LIMIT = 65536
+
+
+def split_token(token):
+    """Split a placeholder into ``(column, spec)``; ``spec`` is None if absent.
+
+    A data column named like the whole token still takes precedence when
+    the slide is rendered (see ``engine.SlideTemplate.record``).
+    """
+    column, sep, spec = token.partition(":")
+    return (column, spec) if sep else (token, None)
+
+
+class ValueFormat:
+    """Turn raw cell values into text according to one format spec."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.currency = spec.startswith("$")
+        body = spec[1:] if self.currency else spec
+        self.body = body
+        if _STRFTIME_RE.search(body):
+            self.kind = "date"
+        elif body and (body[-1] in _NUMBER_TYPES or "," in body or "_" in body):
+            self.kind = "number"
+        else:
+            self.kind = "text"
+        self._memo = {}
+
+    def __call__(self, value):
+        # Keyed by type too, since equal values such as True and 1 format differently
+        key = (type(value), value)
+        try:
+            return self._memo[key]
+        except (KeyError, TypeError):
+            pass
+        text = self._format(value)
+        if len(self._memo) < _MEMO_LIMIT:
+            try:
+                self._memo[key] = text
+            except TypeError:
+                pass
+        return text
+
+    def _format(self, value):
+        text = cell_text(value)
+        if not text:
+            return ""
+        try:
+            if self.kind == "date":
+                return _as_date(value).strftime(self.body)
+            if self.kind == "number":
+                text = format(_as_number(value, self.body[-1] in _INTEGER_TYPES), self.body)
+            else:
+                text = format(text, self.body)
+        except (TypeError, ValueError):
+            # Values the spec cannot format keep their plain text
+            return text
+        if self.currency:
+            return "-$" + text[1:] if text.startswith("-") else "$" + text
+        return text
+
+
+def _as_number(value, integer):
+    if isinstance(value, str):
+        value = float(value.strip().replace(",", "").lstrip("$"))
+    if integer and isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _as_date(value):
+    # datetime, date and pandas Timestamp values format directly
+    if hasattr(value, "strftime"):
+        return value
+    return datetime.fromisoformat(str(value).strip())
@@ -2,127 +2,509 @@
 """Simple PPT generator.
 
 Reads a CSV or Excel file and for each row adds a slide to the template.
-Placeholders in template slides should use the form `{column_name}`.
+Placeholders in template slides should use the form `{column_name}`, or
+`{column_name:spec}` to format the value (e.g. `{Rev:$,.0f}`, `{GP %:.1%}`,
+`{Date Signed:%Y-%m-%d}`). A chart whose alt text holds `{column}` tokens
+is filled from those columns (see charts.py).
+
+With --route-by, each template slide is a section named by its slide name
+(or its PowerPoint section), and every row is rendered by the section its
+column value names; slides without placeholders appear once.
+
+With --sheets, a JSON config maps the sheets of one workbook to templates
+and every sheet's deck is written from a single read of the workbook.
+
+`generate_ppt.py serve` runs a local HTTP render service instead (see
+serve.py). Scripts can import it instead of running it as a subprocess:
+
+    from generate_ppt import Template, render
+    render("template.pptx", dataframe, "out/deck.pptx")
 """
 
 import argparse
+import json
 import os
-import shutil
-import tempfile
-import zipfile
-import copy
-import pandas as pd
-from pptx import Presentation
-from pptx.util import Inches
-from pptx.enum.shapes import MSO_SHAPE_TYPE
-
-
-def replace_placeholders(slide, row):
-    for shape in slide.shapes:
-        # Handle tables
-        if shape.has_table:
-            table = shape.table
-            for row_idx, table_row in enumerate(table.rows):
-                for col_idx, cell in enumerate(table_row.cells):
-                    text = cell.text
-                    for col in row.index:
-                        placeholder = "{" + str(col) + "}"
-                        if placeholder in text:
-                            val = "" if pd.isna(row[col]) else str(row[col])
-                            text = text.replace(placeholder, val)
-                    if text != cell.text:
-                        cell.text_frame.clear()
-                        cell.text_frame.text = text
-        # Handle regular shapes
-        elif not hasattr(shape, "text"):
-            continue
-        else:
-            text = shape.text
-            for col in row.index:
-                placeholder = "{" + str(col) + "}"
-                if placeholder in text:
-                    val = "" if pd.isna(row[col]) else str(row[col])
-                    text = text.replace(placeholder, val)
-            if text != shape.text:
-                try:
-                    shape.text = text
-                except Exception:
-                    if hasattr(shape, "text_frame"):
-                        shape.text_frame.clear()
-                        shape.text_frame.text = text
-
-
-def build_ppt(data_path, template_path, output_path, sheet=None):
-    if data_path.lower().endswith(".csv"):
-        df = pd.read_csv(data_path)
+import re
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+# pandas, openpyxl and the process pool are imported only when needed so
+# that --help and plain CSV runs start quickly
+from charts import embed_workbooks
+from engine import DeckWriter, route_rows
+from incremental import write_incremental
+from instrument import PROFILERS, Timings
+from ingest import cell_text, read_rows, read_sheets
+from opc import compress
+from optimize import PROFILES as OPTIMIZE_PROFILES, describe, optimize
+from templatecache import load_package
+
+
+SHARD_SIZE = 500
+_UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|]+')
+
+_worker_package = None
+
+
+def _init_worker(package):
+    global _worker_package
+    _worker_package = package
+
+
+def _render_shard(columns, pages):
+    # Workers also deflate the parts so the parent only copies bytes
+    slide = _worker_package.slides[0]
+    return [
+        (
+            compress(slide.template.render_rows(columns, page)),
+            {target: compress(xml) for target, xml in slide.render_charts(columns, page).items()},
+        )
+        for page in pages
+    ]
+
+
+def _render_parallel(package, columns, rows, workers):
+    """Yield compressed slide and chart parts rendered across ``workers`` processes.
+
+    Slides are cut into shards and at most two shards per worker are in
+    flight, so results come back in row order without reading ahead.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    pages = package.slides[0].template.paginate(rows)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(package,)) as pool:
+        pending = deque()
+        shards = iter(lambda: list(islice(pages, SHARD_SIZE)), [])
+        for shard in shards:
+            pending.append(pool.submit(_render_shard, columns, shard))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+_DISABLED = Timings(enabled=False)
+
+
+def _write_deck(package, columns, rows, output, workers=1, timings=_DISABLED, route_by=None):
+    routed = {}
+    if route_by:
+        # One pass over the rows; reading them is counted as render time
+        stats = {}
+        slides = timings.wrap(route_rows(package, columns, rows, route_by, stats), "render")
+    elif workers > 1:
+        # Rendering happens in the workers; this is time spent waiting on them
+        slides = timings.wrap(_render_parallel(package, columns, rows, workers), "render")
     else:
-        df = pd.read_excel(data_path, sheet_name=sheet)
-
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Template not found: {template_path}")
-
-    # Handle .potx (template) files by converting to .pptx for loading
-    actual_template = template_path
-    temp_dir = None
-    if template_path.lower().endswith(".potx"):
-        temp_dir = tempfile.mkdtemp()
-        actual_template = os.path.join(temp_dir, "temp_template.pptx")
-        # Convert .potx to .pptx by adjusting the content type in [Content_Types].xml
-        with zipfile.ZipFile(template_path, 'r') as zip_in:
-            with zipfile.ZipFile(actual_template, 'w') as zip_out:
-                for item in zip_in.infolist():
-                    data = zip_in.read(item.filename)
-                    # Replace the presentation template content type with presentation type
-                    if item.filename == '[Content_Types].xml':
-                        data = data.replace(
-                            b'application/vnd.openxmlformats-officedocument.presentationml.template.main+xml',
-                            b'application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml'
-                        )
-                    zip_out.writestr(item, data)
-    
-    try:
-        prs = Presentation(actual_template)
-        
-        # Get the first slide as the template and copy it for each row
-        if len(prs.slides) == 0:
-            raise ValueError("Template has no slides")
-        
-        template_slide = prs.slides[0]
-        blank_slide_layout = prs.slide_layouts[6]  # Blank layout for copying
-
-        for idx, (_, row) in enumerate(df.iterrows()):
-            if idx == 0:
-                # Use the first template slide for the first row
-                slide = template_slide
+        slide = package.slides[0]
+        render_page = timings.timed(
+            lambda page: (slide.template.render_rows(columns, page), slide.render_charts(columns, page)),
+            "render",
+        )
+        slides = (render_page(page) for page in slide.template.paginate(timings.wrap(rows, "read_data")))
+
+    is_path = isinstance(output, (str, os.PathLike))
+    if is_path:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with timings.phase("open_output"):
+        writer = DeckWriter(package, output, routed=bool(route_by))
+    with writer:
+        add_slide = timings.timed(writer.add_slide, "write")
+        with timings.profiled():
+            if route_by:
+                for slide, xml, charts in slides:
+                    add_slide(xml, slide, charts)
+                    routed[slide] = routed.get(slide, 0) + 1
             else:
-                # Copy the template slide's structure
-                # This is a workaround: add blank slide and copy shapes
-                slide = prs.slides.add_slide(blank_slide_layout)
-                for shape in template_slide.shapes:
-                    if shape.has_text_frame:
-                        el = shape.element
-                        newel = copy.deepcopy(el)
-                        slide.shapes._spTree.insert_element_before(newel, 'p:extLst')
-            
-            replace_placeholders(slide, row)
-
-        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
-        prs.save(output_path)
-        print(f"Wrote {output_path}")
-    finally:
-        if temp_dir:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+                for xml, charts in slides:
+                    add_slide(xml, None, charts)
+        with timings.phase("finalize"):
+            writer.close()
+
+    if timings.enabled:
+        counts = routed.items() if route_by else [(package.slides[0], writer.slide_count)]
+        timings.count("slides", writer.slide_count)
+        timings.count("shapes_visited", sum(n * slide.template.shape_count for slide, n in counts))
+        timings.count("placeholders_substituted", sum(
+            n * sum(1 for name in slide.template.slot_columns if name in columns) for slide, n in counts
+        ))
+        timings.count("bytes_written", os.path.getsize(output) if is_path else output.tell())
+    if route_by and stats["unrouted"]:
+        print(f"Skipped {stats['unrouted']} row(s) whose {route_by} matches no template section")
+    if is_path:
+        print(f"Wrote {output}")
+    return writer.slide_count
+
+
+def _is_dataframe(data):
+    # A DataFrame can only exist if pandas has already been imported
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(data, pd.DataFrame)
+
+
+def _tabulate(data, names, sheet=None):
+    """Return ``(columns, rows)`` for a data file path, DataFrame or dicts."""
+    if isinstance(data, (str, os.PathLike)):
+        return read_rows(os.fspath(data), names, sheet=sheet)
+    if _is_dataframe(data):
+        header = [str(col) for col in data.columns]
+        positions = [i for i, col in enumerate(header) if col in names]
+        if not positions and header:
+            # Still one slide per row when no column is referenced
+            positions = [0]
+        frame = data.iloc[:, positions]
+        return [header[i] for i in positions], frame.itertuples(index=False, name=None)
+
+    # Records may leave keys out, so a column is any name some record has;
+    # records without it get a blank cell
+    records = list(data)
+    keys = set().union(*records)
+    columns = [name for name in names if name in keys]
+    return columns, (tuple(record.get(col) for col in columns) for record in records)
+
+
+class Template:
+    """A template compiled once and reusable for any number of decks."""
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Template not found: {path}")
+        self.path = path
+        # Compiled once per template content and reused across runs
+        self.package = load_package(path)
+
+    @property
+    def placeholders(self):
+        return self.package.placeholders
+
+    def columns(self, route_by=None):
+        """Return the data columns a render reads."""
+        if route_by is None:
+            return self.placeholders
+        return self.package.section_placeholders + [route_by]
+
+    def render(self, data, output, sheet=None, workers=1, timings=_DISABLED, route_by=None):
+        """Write one slide per row of ``data`` to ``output``.
+
+        ``data`` may be a CSV/Excel path, a DataFrame or an iterable of
+        dicts; ``output`` may be a path or a writable binary file object.
+        Pass an ``instrument.Timings`` to collect per-phase timings. With
+        ``route_by``, each row is rendered by the template section named
+        by that column's value instead of by the first slide.
+        """
+        if route_by and workers > 1:
+            raise ValueError("Routing rows to sections renders in one process; use workers=1")
+        with timings.phase("open_data"):
+            columns, rows = _tabulate(data, self.columns(route_by), sheet=sheet)
+        _write_deck(self.package, columns, rows, output, workers, timings, route_by)
+
+
+def render(template, data, output, sheet=None, workers=1, timings=_DISABLED, route_by=None):
+    """Render ``data`` through ``template`` (a path or ``Template``) to ``output``."""
+    if not isinstance(template, Template):
+        with timings.phase("template_load"):
+            template = Template(template)
+    template.render(data, output, sheet=sheet, workers=workers, timings=timings, route_by=route_by)
+
+
+def _build_group(columns, rows, output_path, route_by=None):
+    _write_deck(_worker_package, columns, rows, output_path, route_by=route_by)
+
+
+def group_output_path(pattern, column, value):
+    """Return the deck path for one group, e.g. ``out/{Client}.pptx``."""
+    name = _UNSAFE_FILENAME_RE.sub("_", value).strip() or "blank"
+    token = "{" + column + "}"
+    if token in pattern:
+        return pattern.replace(token, name)
+    root, ext = os.path.splitext(pattern)
+    return f"{root}_{name}{ext}"
+
+
+def _build_groups(package, columns, rows, output_path, group_by, workers, timings=_DISABLED, route_by=None):
+    if group_by not in columns:
+        raise ValueError(f"Group-by column not found: {group_by}")
+    key = columns.index(group_by)
+    groups = {}
+    for row in timings.wrap(rows, "read_data"):
+        groups.setdefault(cell_text(row[key]), []).append(row)
+
+    outputs = {value: group_output_path(output_path, group_by, value) for value in groups}
+    # Values that differ only in characters a filename cannot hold would
+    # overwrite each other's deck
+    clashes = {}
+    for value, path in outputs.items():
+        clashes.setdefault(path, []).append(value)
+    clashes = {path: values for path, values in clashes.items() if len(values) > 1}
+    if clashes:
+        raise ValueError("Group values map to the same output file: " + "; ".join(
+            f"{', '.join(repr(value) for value in values)} -> {path}" for path, values in clashes.items()
+        ))
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Each worker renders whole decks from its own copy of the template
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(package,)) as pool:
+            futures = [
+                pool.submit(_build_group, columns, group_rows, outputs[value], route_by)
+                for value, group_rows in groups.items()
+            ]
+            for future in futures:
+                future.result()
+    else:
+        for value, group_rows in groups.items():
+            _write_deck(package, columns, group_rows, outputs[value], timings=timings, route_by=route_by)
+    return list(outputs.values())
+
+
+def build_ppt(data_path, template_path, output_path, sheet=None, workers=1, group_by=None,
+              incremental=False, key=None, timings=_DISABLED, route_by=None):
+    """Write the deck(s) for ``data_path`` and return the paths written."""
+    with timings.phase("template_load"):
+        template = Template(template_path)
+    if not (group_by or incremental):
+        template.render(
+            data_path, output_path, sheet=sheet, workers=workers, timings=timings, route_by=route_by
+        )
+        return [output_path]
+
+    # Load only the columns the template references, plus the group/key column
+    extra = [col for col in (group_by, key) if col]
+    with timings.phase("open_data"):
+        columns, rows = read_rows(data_path, template.columns(route_by) + extra, sheet=sheet)
+    if group_by:
+        return _build_groups(
+            template.package, columns, rows, output_path, group_by, workers, timings, route_by
+        )
+
+    if route_by:
+        raise ValueError("Incremental runs do not support routing rows to sections")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with timings.phase("render"):
+        stats = write_incremental(template.package, template_path, columns, rows, output_path, key=key)
+    print(
+        f"Wrote {output_path} (reused {stats['reused']}, added {stats['added']}, "
+        f"modified {stats['modified']}, deleted {stats['deleted']})"
+    )
+    return [output_path]
+
+
+SHEET_SETTINGS = ("template", "output", "route_by")
+
+
+def load_sheet_config(path):
+    """Return ``{sheet: {"template", "output", "route_by"}}`` from a JSON config.
+
+    The config maps each sheet name to a template path, or to an object
+    with a ``template`` and optionally an ``output`` and a ``route_by``
+    column. Relative paths are taken from the config file's directory.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    if not isinstance(config, dict) or not config:
+        raise ValueError(f"{path}: expected an object mapping sheet names to templates")
+    base = os.path.dirname(os.path.abspath(path))
+    sheets = {}
+    for sheet, entry in config.items():
+        if isinstance(entry, str):
+            entry = {"template": entry}
+        if not isinstance(entry, dict) or "template" not in entry:
+            raise ValueError(f"{path}: sheet '{sheet}' has no template")
+        unknown = set(entry) - set(SHEET_SETTINGS)
+        if unknown:
+            raise ValueError(f"{path}: unknown setting(s) for sheet '{sheet}': {', '.join(sorted(unknown))}")
+        sheets[sheet] = {
+            "template": os.path.join(base, entry["template"]),
+            "output": entry.get("output") and os.path.join(base, entry["output"]),
+            "route_by": entry.get("route_by"),
+        }
+    return sheets
+
+
+def _build_sheet(package, columns, rows, output_path, route_by, timed):
+    # Returns the slide count and render time, plus the deck's own timings
+    # when they are collected, so a worker can send them back
+    timings = Timings() if timed else _DISABLED
+    wall = time.perf_counter()
+    slides = _write_deck(package, columns, rows, output_path, timings=timings, route_by=route_by)
+    return slides, time.perf_counter() - wall, timings.report() if timed else None
+
+
+def build_sheets(data_path, sheets, output_path, workers=1, timings=_DISABLED):
+    """Write one deck per sheet of a workbook and return the paths written.
+
+    ``sheets`` comes from ``load_sheet_config``. The workbook is read once
+    for all sheets and the decks are rendered across ``workers`` processes.
+    Sheets without an ``output`` are written to ``output_path``, which may
+    use ``{sheet}``, e.g. ``out/{sheet}.pptx``.
+    """
+    templates = {}
+    with timings.phase("template_load"):
+        for entry in sheets.values():
+            if entry["template"] not in templates:
+                templates[entry["template"]] = Template(entry["template"])
+    outputs = {
+        sheet: entry["output"] or group_output_path(output_path, "sheet", sheet)
+        for sheet, entry in sheets.items()
+    }
+    with timings.phase("open_data"):
+        data = read_sheets(data_path, {
+            sheet: templates[entry["template"]].columns(entry["route_by"]) for sheet, entry in sheets.items()
+        })
+    # A bad route_by column stops the run before any deck is written
+    for sheet, entry in sheets.items():
+        if entry["route_by"]:
+            route_rows(templates[entry["template"]].package, data[sheet][0], (), entry["route_by"])
+    jobs = {
+        sheet: (
+            templates[entry["template"]].package, *data[sheet], outputs[sheet], entry["route_by"],
+            timings.enabled,
+        )
+        for sheet, entry in sheets.items()
+    }
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+            futures = {sheet: pool.submit(_build_sheet, *job) for sheet, job in jobs.items()}
+            results = {sheet: future.result() for sheet, future in futures.items()}
+    else:
+        results = {sheet: _build_sheet(*job) for sheet, job in jobs.items()}
+
+    for sheet, (slides, wall, report) in results.items():
+        if report is not None:
+            total = report["total"]
+            timings.add(f"sheet:{sheet}", total["wall_s"], total["cpu_s"])
+            for name, phase in report["phases"].items():
+                timings.add(f"sheet:{sheet}/{name}", phase["wall_s"], phase["cpu_s"], phase["calls"])
+            for name, n in report["counters"].items():
+                timings.count(name, n)
+        print(f"{sheet}: {len(data[sheet][1])} row(s), {slides} slide(s) in {wall:.2f}s -> {outputs[sheet]}")
+    return list(outputs.values())
 
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        # Long-running render service; see serve.py
+        from serve import main as serve_main
+
+        serve_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description="Generate PPT from template and data file")
     parser.add_argument("--data", required=True, help="Path to Excel (.xlsx) or CSV file")
     parser.add_argument("--template", default="template.pptx", help="Path to template PPTX")
     parser.add_argument("--output", default="output.pptx", help="Output PPTX path")
     parser.add_argument("--sheet", default=None, help="Excel sheet name or index (optional)")
+    parser.add_argument(
+        "--sheets",
+        default=None,
+        help="JSON config mapping sheet names to templates; writes one deck per sheet, "
+        "--output may use {sheet}, e.g. out/{sheet}.pptx",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Render rows across N processes")
+    parser.add_argument(
+        "--group-by",
+        default=None,
+        help="Write one deck per value of this column; --output may use it, e.g. out/{Client}.pptx",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse unchanged slides from the previous --output (tracked in a .manifest.json beside it)",
+    )
+    parser.add_argument("--key", default=None, help="Column identifying rows for --incremental")
+    parser.add_argument(
+        "--route-by",
+        default=None,
+        help="Render each row with the template slides whose section name matches this column",
+    )
+    parser.add_argument(
+        "--chart-workbooks",
+        action="store_true",
+        help="Embed a workbook in every bound chart after rendering so PowerPoint can edit its data",
+    )
+    parser.add_argument(
+        "--optimize",
+        choices=list(OPTIMIZE_PROFILES),
+        default=None,
+        help="Prune unused layouts, dedupe parts and recompress the output with this profile",
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="-",
+        default=None,
+        help="Write a JSON report of per-phase wall/CPU time and counters to this file (stdout if no path)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=PROFILERS,
+        default=[],
+        help="Capture a profiler around the render loop into the --timings report (repeatable)",
+    )
     args = parser.parse_args()
+    if args.incremental and args.group_by:
+        parser.error("--incremental cannot be combined with --group-by")
+    if args.route_by and args.incremental:
+        parser.error("--route-by cannot be combined with --incremental")
+    if args.sheets and (args.sheet or args.group_by or args.incremental or args.route_by):
+        parser.error("--sheets cannot be combined with --sheet, --group-by, --incremental or --route-by")
+    if args.route_by and args.workers > 1 and not args.group_by:
+        parser.error("--route-by renders in one process; use --workers only with --group-by")
+    sheets = None
+    if args.sheets:
+        try:
+            sheets = load_sheet_config(args.sheets)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    report_to = args.timings or ("-" if args.profile else None)
+    timings = Timings(profile=args.profile) if report_to else _DISABLED
+
+    if sheets:
+        try:
+            outputs = build_sheets(args.data, sheets, args.output, workers=args.workers, timings=timings)
+        except ValueError as e:
+            # Missing sheets and bad route_by columns are found before any deck is written
+            parser.error(str(e))
+    else:
+        outputs = build_ppt(
+            args.data,
+            args.template,
+            args.output,
+            sheet=args.sheet,
+            workers=args.workers,
+            group_by=args.group_by,
+            incremental=args.incremental,
+            key=args.key,
+            timings=timings,
+            route_by=args.route_by,
+        )
+
+    if args.chart_workbooks:
+        for path in outputs:
+            with timings.phase("chart_workbooks"):
+                count = embed_workbooks(path)
+            print(f"Embedded {count} chart workbook(s) in {path}")
 
-    build_ppt(args.data, args.template, args.output, sheet=args.sheet)
+    if args.optimize:
+        for path in outputs:
+            with timings.phase("optimize"):
+                report = optimize(path, profile=args.optimize)
+            print(f"Optimized {path}: {describe(report)}")
+
+    if report_to:
+        report = json.dumps(timings.report(), indent=2)
+        if report_to == "-":
+            print(report)
+        else:
+            with open(report_to, "w") as f:
+                f.write(report + "\n")
+            print(f"Wrote timings to {report_to}")
 
 
 if __name__ == "__main__":
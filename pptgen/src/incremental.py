@@ -0,0 +1,111 @@
+"""Incremental regeneration of a deck from its previous run.
+
+A manifest stored next to the output records, for every slide, the row's
+key, a hash of the row's values and the CRC of the slide part. On the next
+run, rows whose values are unchanged reuse the previous deck's compressed
+slide part byte for byte; only added or modified rows are rendered, and
+rows that disappeared from the data are dropped.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+
+from diskcache import file_hash
+from engine import DeckWriter
+from ingest import cell_text
+from opc import CompressedPart, compress, read_raw
+from templatecache import code_version
+
+# Bump when the manifest layout changes; slides rendered by other code are
+# never reused because the manifest also records the rendering code's digest
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output_path):
+    return output_path + ".manifest.json"
+
+
+def row_hash(texts):
+    return hashlib.sha1("\x1f".join(texts).encode("utf-8")).hexdigest()
+
+
+def load_manifest(output_path, expected):
+    """Return the previous manifest's slides by key, or {} if it cannot be reused."""
+    path = manifest_path(output_path)
+    if not (os.path.exists(path) and os.path.exists(output_path)):
+        return {}
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if any(manifest.get(field) != value for field, value in expected.items()):
+        return {}
+    return {slide["key"]: slide for slide in manifest.get("slides", [])}
+
+
+def write_incremental(package, template_path, columns, rows, output_path, key=None):
+    """Write ``output_path`` reusing unchanged slides from its previous version.
+
+    Rows are matched by the ``key`` column, or by their values when no key
+    is given. Returns counts of reused, added, modified and deleted rows.
+    """
+    slide = package.slides[0]
+    template = slide.template
+    if template.repeats:
+        raise ValueError("Incremental mode does not support templates with a repeating table row")
+    if slide.charts:
+        raise ValueError("Incremental mode does not support templates with bound charts")
+    if key is not None and key not in columns:
+        raise ValueError(f"Key column not found: {key}")
+    key_index = None if key is None else columns.index(key)
+    expected = {
+        "version": MANIFEST_VERSION,
+        "code": code_version(),
+        "template": file_hash(template_path),
+        "columns": columns,
+        "key": key,
+    }
+    previous = load_manifest(output_path, expected)
+    old_deck = zipfile.ZipFile(output_path) if previous else None
+
+    stats = {"reused": 0, "added": 0, "modified": 0, "deleted": 0}
+    slides = []
+    seen = set()
+    tmp_path = output_path + ".tmp"
+    try:
+        with DeckWriter(package, tmp_path) as writer:
+            for row in rows:
+                texts = [cell_text(val) for val in row]
+                digest = row_hash(texts)
+                row_key = digest if key_index is None else texts[key_index]
+                seen.add(row_key)
+
+                part = None
+                entry = previous.get(row_key)
+                if entry is not None and entry["row"] == digest:
+                    info = old_deck.NameToInfo.get(entry["part"])
+                    if info is not None and info.CRC == entry["crc"]:
+                        part = CompressedPart(read_raw(old_deck, info), info.CRC, info.file_size)
+                        stats["reused"] += 1
+                if part is None:
+                    part = compress(template.render_rows(columns, [row]))
+                    stats["modified" if entry is not None else "added"] += 1
+
+                partname = writer.add_slide(part)
+                slides.append({"key": row_key, "row": digest, "part": partname, "crc": part.crc})
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if old_deck is not None:
+            old_deck.close()
+
+    os.replace(tmp_path, output_path)
+    stats["deleted"] = len(set(previous) - seen)
+    with open(manifest_path(output_path), "w") as f:
+        json.dump(dict(expected, slides=slides), f)
+    return stats
@@ -0,0 +1,230 @@
+"""Column-projected, streaming data ingestion.
+
+Only the columns a template references are loaded. CSV files are streamed
+with the stdlib csv module and workbooks with openpyxl in read-only mode,
+so rows reach the renderer as plain tuples without materializing the
+whole sheet. Neither pandas nor openpyxl is imported for CSV input.
+
+The columns read from a workbook are kept in an on-disk cache (see
+``sheetcache``) as they stream past, so later reads of them from an
+unchanged workbook skip openpyxl entirely.
+"""
+
+import csv
+
+import sheetcache
+
+# pandas' missing-value markers, recognized without importing pandas
+_MISSING_TYPES = {"NaTType", "NAType"}
+
+# Rough pickled size of a cached cell, used to stop buffering a sheet that
+# would not fit in the sheet cache anyway
+_CELL_BYTES = 16
+
+
+def cell_text(value):
+    """Convert a raw cell value to the text substituted into a slide."""
+    if type(value) is str:
+        return value
+    if value is None or type(value).__name__ in _MISSING_TYPES:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+
+def read_rows(data_path, names, sheet=None):
+    """Return ``(columns, rows)`` holding only the columns listed in ``names``.
+
+    ``columns`` is in file order and ``rows`` lazily yields one tuple per
+    data row. When no column matches, the first column is still read so
+    every row gets its slide. ``names=None`` reads every column.
+    """
+    names = None if names is None else set(names)
+    if data_path.lower().endswith(".csv"):
+        return _read_csv(data_path, names)
+    if sheetcache.enabled():
+        return _read_cached_xlsx(data_path, names, sheet)
+    return _read_xlsx(data_path, names, sheet)
+
+
+def read_frame(data_path, names=None, sheet=None):
+    """Return a data file (or only its ``names`` columns) as a DataFrame."""
+    import pandas as pd
+
+    columns, rows = read_rows(data_path, names, sheet=sheet)
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+def _project(header, names):
+    if names is None:
+        return list(header)
+    columns = [col for col in header if col in names]
+    return columns or header[:1]
+
+
+def _read_csv(data_path, names):
+    # Values are kept as the text in the file; blanks become ""
+    f = open(data_path, newline="", encoding="utf-8-sig")
+    reader = csv.reader(f)
+    header = next(reader, [])
+    columns = _project(header, names)
+    positions = [header.index(col) for col in columns]
+
+    def rows():
+        with f:
+            for record in reader:
+                if not record:
+                    continue
+                width = len(record)
+                yield tuple(record[i] if i < width else "" for i in positions)
+
+    return columns, rows()
+
+
+def _worksheet(workbook, sheet):
+    if sheet is None:
+        return workbook.worksheets[0]
+    if sheet in workbook.sheetnames:
+        return workbook[sheet]
+    if str(sheet).isdigit():
+        return workbook.worksheets[int(sheet)]
+    raise ValueError(f"Worksheet named '{sheet}' not found")
+
+
+def _open_workbook(data_path):
+    from openpyxl import load_workbook
+
+    return load_workbook(data_path, read_only=True, data_only=True)
+
+
+def _sheet_values(workbook, sheet):
+    values = _worksheet(workbook, sheet).iter_rows(values_only=True)
+    header = next(values, ())
+    header = [f"Unnamed: {i}" if col is None else str(col) for i, col in enumerate(header)]
+    return header, values
+
+
+def _open_sheet(data_path, sheet):
+    workbook = _open_workbook(data_path)
+    header, values = _sheet_values(workbook, sheet)
+    return workbook, header, values
+
+
+def _sheet_rows(workbook, values, positions):
+    # Closes ``workbook`` once the rows are read, unless it is None
+    try:
+        blank = 0
+        for values_row in values:
+            if all(val is None for val in values_row):
+                # Trailing blank rows are formatting, not data
+                blank += 1
+                continue
+            for _ in range(blank):
+                yield (None,) * len(positions)
+            blank = 0
+            width = len(values_row)
+            yield tuple(values_row[i] if i < width else None for i in positions)
+    finally:
+        if workbook is not None:
+            workbook.close()
+
+
+def _read_xlsx(data_path, names, sheet):
+    workbook, header, values = _open_sheet(data_path, sheet)
+    columns = _project(header, names)
+    positions = [header.index(col) for col in columns]
+    return columns, _sheet_rows(workbook, values, positions)
+
+
+def _load_cached(data_path, sheet, names):
+    # Returns the cache entry (or None) and, when it holds every projected
+    # column, ``(columns, rows)`` served from it
+    cached = sheetcache.load(data_path, sheet)
+    if cached is None:
+        return None, None
+    header, data = cached
+    columns = _project(header, names)
+    if not all(col in data for col in columns):
+        return cached, None
+    return cached, (columns, zip(*(data[col] for col in columns)))
+
+
+def _caching_rows(data_path, sheet, header, columns, rows, cached):
+    # Rows are passed on as they are parsed and their values kept, so the
+    # projected columns can be cached once the sheet has been read to the
+    # end. A sheet too large for the cache is not buffered past that point.
+    data = [[] for _ in columns]
+    limit = sheetcache.max_bytes() // (_CELL_BYTES * max(len(columns), 1))
+    for count, row in enumerate(rows):
+        if data is not None:
+            if count < limit:
+                for values, value in zip(data, row):
+                    values.append(value)
+            else:
+                data = None
+        yield row
+    if data is not None:
+        merged = dict(cached[1]) if cached is not None and cached[0] == header else {}
+        merged.update(zip(columns, data))
+        sheetcache.store(data_path, sheet, header, merged)
+
+
+def _read_cached_xlsx(data_path, names, sheet):
+    cached, hit = _load_cached(data_path, sheet, names)
+    if hit is not None:
+        return hit
+    workbook, header, values = _open_sheet(data_path, sheet)
+    columns = _project(header, names)
+    positions = [header.index(col) for col in columns]
+    rows = _sheet_rows(workbook, values, positions)
+    return columns, _caching_rows(data_path, sheet, header, columns, rows, cached)
+
+
+def read_sheets(data_path, sheets):
+    """Return ``{sheet: (columns, rows)}`` for several sheets of one workbook.
+
+    ``sheets`` maps each sheet name to the column names it needs (None for
+    every column). The workbook is opened once and each sheet streamed from
+    it in turn; sheets whose columns are all in the sheet cache are not
+    parsed at all. ``rows`` are lists, so they can be handed to worker
+    processes. Raises ValueError naming any sheet the workbook lacks
+    before a sheet is parsed.
+    """
+    if data_path.lower().endswith(".csv"):
+        raise ValueError("Reading several sheets needs an Excel workbook, not a CSV file")
+    projections = {sheet: None if names is None else set(names) for sheet, names in sheets.items()}
+    result = {}
+    missing = {}
+    for sheet, names in projections.items():
+        cached, hit = _load_cached(data_path, sheet, names) if sheetcache.enabled() else (None, None)
+        if hit is not None:
+            columns, rows = hit
+            result[sheet] = columns, list(rows)
+        else:
+            missing[sheet] = cached
+    if missing:
+        workbook = _open_workbook(data_path)
+        try:
+            # Sheets served from the cache exist, so only these need checking
+            names = workbook.sheetnames
+            absent = [
+                str(sheet) for sheet in missing
+                if sheet not in names and not (str(sheet).isdigit() and int(sheet) < len(names))
+            ]
+            if absent:
+                raise ValueError(f"Sheet(s) not found in {data_path}: {', '.join(absent)}")
+            for sheet, cached in missing.items():
+                header, values = _sheet_values(workbook, sheet)
+                columns = _project(header, projections[sheet])
+                positions = [header.index(col) for col in columns]
+                rows = _sheet_rows(None, values, positions)
+                if sheetcache.enabled():
+                    rows = _caching_rows(data_path, sheet, header, columns, rows, cached)
+                result[sheet] = columns, list(rows)
+        finally:
+            workbook.close()
+    return {sheet: result[sheet] for sheet in projections}
@@ -0,0 +1,164 @@
+"""Per-phase timings, counters and optional profiling for a generation run.
+
+A disabled ``Timings`` hands back the functions and iterables it is asked
+to wrap unchanged, so the normal path pays nothing for instrumentation.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILERS = ("cprofile", "tracemalloc")
+
+
+class Timings:
+    """Collect wall and CPU time per phase plus counters for one run.
+
+    ``hooks`` are callables invoked as ``hook(event, payload)``: a
+    ``"phase"`` event each time a phase block ends and a ``"report"`` event
+    with the final report. ``profile`` may name any of ``PROFILERS`` to
+    capture around the render loop.
+    """
+
+    def __init__(self, enabled=True, hooks=(), profile=()):
+        unknown = set(profile) - set(PROFILERS)
+        if unknown:
+            raise ValueError(f"Unknown profiler(s): {', '.join(sorted(unknown))}")
+        self.enabled = enabled
+        self.hooks = list(hooks)
+        self.profile = tuple(profile)
+        self.phases = {}
+        self.counters = Counter()
+        self.profiles = {}
+        self._start = (time.perf_counter(), time.process_time())
+
+    def add(self, name, wall, cpu, calls=1):
+        if not self.enabled:
+            return
+        phase = self.phases.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+        phase["wall_s"] += wall
+        phase["cpu_s"] += cpu
+        phase["calls"] += calls
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block as (part of) phase ``name``."""
+        if not self.enabled:
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self.add(name, wall, cpu)
+            self._emit("phase", {"name": name, "wall_s": wall, "cpu_s": cpu})
+
+    def timed(self, fn, name):
+        """Return ``fn`` wrapped so every call is added to phase ``name``."""
+        if not self.enabled:
+            return fn
+        perf_counter, process_time = time.perf_counter, time.process_time
+
+        def wrapper(*args):
+            wall, cpu = perf_counter(), process_time()
+            try:
+                return fn(*args)
+            finally:
+                self.add(name, perf_counter() - wall, process_time() - cpu)
+
+        return wrapper
+
+    def wrap(self, iterable, name):
+        """Return ``iterable`` with the time spent producing items added to ``name``."""
+        if not self.enabled:
+            return iterable
+        return self._wrap(iter(iterable), name)
+
+    def _wrap(self, iterator, name):
+        perf_counter, process_time = time.perf_counter, time.process_time
+        while True:
+            wall, cpu = perf_counter(), process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, perf_counter() - wall, process_time() - cpu, calls=0)
+                return
+            self.add(name, perf_counter() - wall, process_time() - cpu)
+            yield item
+
+    @contextmanager
+    def profiled(self):
+        """Run the requested profilers around a block (the render loop)."""
+        if not (self.enabled and self.profile):
+            yield
+            return
+        profiler = None
+        if "tracemalloc" in self.profile:
+            import tracemalloc
+
+            tracemalloc.start()
+        if "cprofile" in self.profile:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.profiles["cprofile"] = _cprofile_top(profiler)
+            if "tracemalloc" in self.profile:
+                self.profiles["tracemalloc"] = _tracemalloc_summary()
+
+    def report(self):
+        wall, cpu = self._start
+        report = {
+            "total": {
+                "wall_s": time.perf_counter() - wall,
+                "cpu_s": time.process_time() - cpu,
+            },
+            "phases": self.phases,
+            "counters": dict(self.counters),
+        }
+        report.update(self.profiles)
+        self._emit("report", report)
+        return report
+
+    def _emit(self, event, payload):
+        for hook in self.hooks:
+            hook(event, payload)
+
+
+def _cprofile_top(profiler, limit=25):
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, func), (cc, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({func})",
+            "calls": calls,
+            "tottime_s": tottime,
+            "cumtime_s": cumtime,
+        })
+    rows.sort(key=lambda row: row["cumtime_s"], reverse=True)
+    return rows[:limit]
+
+
+def _tracemalloc_summary(limit=10):
+    import tracemalloc
+
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics("lineno")[:limit]
+    tracemalloc.stop()
+    return {
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top": [{"where": str(stat.traceback), "bytes": stat.size, "count": stat.count} for stat in top],
+    }
@@ -0,0 +1,123 @@
+"""Declarative summary metrics for summary slides.
+
+A summary is a list of ``Metric`` specs. ``evaluate`` works out which
+columns each kind of metric needs and computes them together: numeric
+columns are coerced once, sums and means run over all their columns in
+one call each, every group-by column is grouped once for all top-k
+metrics, and count-where and breakdown metrics on a column share one
+``value_counts``. Adding a KPI therefore adds no extra scan of the data.
+
+    values = evaluate(frame, REVENUE_SUMMARY)
+    render(template, [as_text(values, REVENUE_SUMMARY)], output)
+"""
+
+from collections import namedtuple
+
+from formatting import ValueFormat
+from ingest import read_frame
+
+# op is one of OPS; spec is a placeholder format spec used by as_text
+Metric = namedtuple("Metric", "name op column by where k spec", defaults=(None, None, None, 1, None))
+
+OPS = ("count", "sum", "mean", "nunique", "count_where", "top", "top_value", "top_k", "breakdown")
+_NUMERIC_OPS = {"sum", "mean", "top", "top_value", "top_k"}
+
+REVENUE_SUMMARY = [
+    Metric("Total Revenue", "sum", "Rev", spec="$,.2f"),
+    Metric("Total Hours", "sum", "Hours", spec=",.0f"),
+    Metric("Total Projects", "count"),
+    Metric("Total Clients", "nunique", "Client"),
+    Metric("Average Revenue per Project", "mean", "Rev", spec="$,.2f"),
+    Metric("Average Hours per Project", "mean", "Hours", spec=",.1f"),
+    Metric("Total GP $", "sum", "GP $", spec="$,.2f"),
+    Metric("Average GP %", "mean", "GP %", spec=".1%"),
+    Metric("Top Client", "top", "Rev", by="Client"),
+    Metric("Top Client Revenue", "top_value", "Rev", by="Client", spec="$,.2f"),
+    Metric("Won Projects", "count_where", "Status", where="Won"),
+    Metric("Status Breakdown", "breakdown", "Status"),
+    Metric("Revenue by Client", "top_k", "Rev", by="Client", k=10, spec="$,.0f"),
+]
+
+
+def metric_columns(metrics):
+    """Return the data columns a list of metrics reads, in first-use order."""
+    columns = []
+    for metric in metrics:
+        columns.extend(col for col in (metric.column, metric.by) if col)
+    return list(dict.fromkeys(columns))
+
+
+def load_frame(data_path, metrics, sheet=None):
+    """Read only the columns ``metrics`` need from a CSV or workbook."""
+    return read_frame(data_path, metric_columns(metrics), sheet=sheet)
+
+
+def evaluate(frame, metrics):
+    """Return ``{metric name: value}`` for every metric over ``frame``."""
+    import pandas as pd
+
+    unknown = {metric.op for metric in metrics} - set(OPS)
+    if unknown:
+        raise ValueError(f"Unknown metric op(s): {', '.join(sorted(unknown))}")
+    missing = [col for col in metric_columns(metrics) if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Metric column(s) not found: {', '.join(missing)}")
+
+    def used(ops, field="column"):
+        return list(dict.fromkeys(getattr(m, field) for m in metrics if m.op in ops))
+
+    numeric = frame[used(_NUMERIC_OPS)].apply(pd.to_numeric, errors="coerce")
+    sums = numeric[used({"sum"})].sum()
+    means = numeric[used({"mean"})].mean()
+    nunique = frame[used({"nunique"})].nunique()
+    counts = {col: frame[col].value_counts() for col in used({"count_where", "breakdown"})}
+    ranked = {}
+    for by in used({"top", "top_value", "top_k"}, "by"):
+        # One groupby per key column serves every top-k metric on it
+        cols = list(dict.fromkeys(m.column for m in metrics if m.by == by and m.op in _NUMERIC_OPS))
+        totals = numeric[cols].groupby(frame[by]).sum()
+        for col in cols:
+            ranked[by, col] = totals[col].sort_values(ascending=False, kind="stable")
+
+    values = {}
+    for metric in metrics:
+        op, col = metric.op, metric.column
+        if op == "count":
+            value = len(frame)
+        elif op == "sum":
+            value = sums[col]
+        elif op == "mean":
+            value = means[col]
+        elif op == "nunique":
+            value = nunique[col]
+        elif op == "count_where":
+            value = counts[col].get(metric.where, 0)
+        elif op == "breakdown":
+            value = counts[col].to_dict()
+        else:
+            top = ranked[metric.by, col]
+            if op == "top_k":
+                value = list(top.head(metric.k).items())
+            elif len(top) < metric.k:
+                value = None
+            elif op == "top":
+                value = top.index[metric.k - 1]
+            else:
+                value = top.iloc[metric.k - 1]
+        values[metric.name] = value.item() if hasattr(value, "item") else value
+    return values
+
+
+def as_text(values, metrics):
+    """Format evaluated metrics for substitution into a summary template."""
+    text = {}
+    for metric in metrics:
+        value = values[metric.name]
+        fmt = ValueFormat(metric.spec) if metric.spec else str
+        if isinstance(value, dict):
+            text[metric.name] = ", ".join(f"{key}: {fmt(val)}" for key, val in value.items())
+        elif isinstance(value, list):
+            text[metric.name] = ", ".join(f"{key} ({fmt(val)})" for key, val in value)
+        else:
+            text[metric.name] = "" if value is None else fmt(value)
+    return text
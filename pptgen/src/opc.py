@@ -0,0 +1,82 @@
+"""Zip-level helpers for Open Packaging (pptx/potx) files."""
+
+import copy
+import io
+import struct
+import time
+import zipfile
+import zlib
+from collections import namedtuple
+
+CONTENT_TYPES = "[Content_Types].xml"
+TEMPLATE_MAIN_CT = b"application/vnd.openxmlformats-officedocument.presentationml.template.main+xml"
+PRESENTATION_MAIN_CT = b"application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"
+
+# A member compressed ahead of time, e.g. in a worker process
+CompressedPart = namedtuple("CompressedPart", "data crc size")
+
+
+def compress(data):
+    """Deflate ``data`` exactly as ``ZipFile.writestr`` would."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return CompressedPart(compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data))
+
+
+def read_raw(zin, info):
+    """Return the still-compressed bytes of ``info`` inside ``zin``."""
+    zin.fp.seek(info.header_offset)
+    header = zin.fp.read(zipfile.sizeFileHeader)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    zin.fp.seek(info.header_offset + zipfile.sizeFileHeader + name_len + extra_len)
+    return zin.fp.read(info.compress_size)
+
+
+def write_raw(zout, info, raw):
+    """Append an already-compressed member to ``zout`` as-is."""
+    out = copy.copy(info)
+    out.flag_bits &= ~0x08  # sizes live in the local header, no data descriptor
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader())
+    zout.fp.write(raw)
+    zout.filelist.append(out)
+    zout.NameToInfo[out.filename] = out
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+
+def write_compressed(zout, name, part):
+    """Add a ``CompressedPart`` to ``zout`` under ``name``."""
+    info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    info.CRC = part.crc
+    info.file_size = part.size
+    info.compress_size = len(part.data)
+    write_raw(zout, info, part.data)
+
+
+def copy_member(zin, zout, info):
+    """Copy one member between zips without decompressing it."""
+    write_raw(zout, info, read_raw(zin, info))
+
+
+def open_template(path):
+    """Return something ``Presentation()`` can load for ``path``.
+
+    ``.pptx`` paths are returned unchanged. For ``.potx`` the package is
+    rebuilt in memory with the presentation content type patched into
+    ``[Content_Types].xml``; every other member is copied without being
+    recompressed.
+    """
+    if not path.lower().endswith(".potx"):
+        return path
+    buf = io.BytesIO()
+    with zipfile.ZipFile(path, "r") as zin, zipfile.ZipFile(buf, "w") as zout:
+        for info in zin.infolist():
+            if info.filename == CONTENT_TYPES:
+                data = zin.read(info).replace(TEMPLATE_MAIN_CT, PRESENTATION_MAIN_CT)
+                zout.writestr(info, data)
+            else:
+                copy_member(zin, zout, info)
+    buf.seek(0)
+    return buf
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Shrink a finished deck before it is mailed or archived.
+
+Three passes run over the saved package:
+
+* prune: slide layouts no slide uses are removed from their masters, masters
+  left without layouts are removed from the presentation, and every part no
+  longer reachable from the package relationships is dropped;
+* dedupe: byte-identical media and embedded parts are stored once and all
+  relationships point at the kept copy;
+* recompress with a profile: ``fast`` (deflate level 1, already-compressed
+  media stored), ``balanced`` (level 6, media stored) or ``small`` (level 9,
+  media stored only where deflate does not help).
+
+    python pptgen/src/optimize.py out/deck.pptx --profile small
+    python pptgen/src/optimize.py out/deck.pptx --profile all   # compare, write nothing
+"""
+
+import argparse
+import hashlib
+import os
+import posixpath
+import tempfile
+import time
+import zipfile
+import zlib
+
+from lxml import etree
+
+from engine import (
+    CONTENT_TYPES,
+    NS,
+    R_NS,
+    RT_OFFICE_DOCUMENT,
+    RT_SLIDE,
+    rels_path,
+    rels_source,
+    resolve,
+    serialize,
+)
+
+PROFILES = {"fast": 1, "balanced": 6, "small": 9}
+# Formats that are compressed already; deflating them again mostly wastes time
+COMPRESSED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".jfif", ".gif", ".wdp", ".mp3", ".m4a", ".mp4", ".m4v", ".mov",
+    ".wmv", ".wma", ".zip", ".xlsx", ".xlsm", ".docx", ".pptx",
+}
+
+RT_SLIDE_LAYOUT = R_NS + "/slideLayout"
+RT_SLIDE_MASTER = R_NS + "/slideMaster"
+# Parts reached only through these relationships may be shared by several sources
+SHAREABLE_RELTYPES = {
+    R_NS + "/image",
+    R_NS + "/audio",
+    R_NS + "/video",
+    R_NS + "/oleObject",
+    R_NS + "/package",
+    R_NS + "/font",
+    "http://schemas.microsoft.com/office/2007/relationships/media",
+    "http://schemas.microsoft.com/office/2007/relationships/hdphoto",
+    "http://schemas.microsoft.com/office/2011/relationships/chartStyle",
+    "http://schemas.microsoft.com/office/2011/relationships/chartColorStyle",
+}
+
+
+class _Package:
+    """A deck's parts held in memory with parsed relationships on demand."""
+
+    def __init__(self, path):
+        with zipfile.ZipFile(path) as zin:
+            self.infos = {info.filename: info for info in zin.infolist()}
+            self.parts = {name: zin.read(name) for name in self.infos}
+        self._rels = {}
+
+    def rels(self, partname):
+        """Return the relationships element of ``partname`` (None if it has none)."""
+        name = rels_path(partname) if partname else "_rels/.rels"
+        if name not in self._rels:
+            data = self.parts.get(name)
+            self._rels[name] = None if data is None else etree.fromstring(data)
+        return self._rels[name]
+
+    def targets(self, partname, reltype=None):
+        rels = self.rels(partname)
+        if rels is None:
+            return []
+        return [
+            (rel, resolve(partname, rel.get("Target")).lstrip("/"))
+            for rel in rels
+            if rel.get("TargetMode") != "External" and (reltype is None or rel.get("Type") == reltype)
+        ]
+
+    def save_rels(self):
+        for name, rels in self._rels.items():
+            if rels is not None and name in self.parts:
+                self.parts[name] = serialize(rels)
+
+    def drop(self, names):
+        content_types = etree.fromstring(self.parts[CONTENT_TYPES])
+        for override in list(content_types.iterfind("ct:Override", NS)):
+            if override.get("PartName").lstrip("/") in names:
+                content_types.remove(override)
+        self.parts[CONTENT_TYPES] = serialize(content_types)
+        for name in names:
+            self.parts.pop(name, None)
+            self.parts.pop(rels_path(name), None)
+            self._rels.pop(rels_path(name), None)
+
+
+def prune(package):
+    """Remove unused layouts and masters and every unreachable part."""
+    presentation = next(target for _, target in package.targets("", RT_OFFICE_DOCUMENT))
+    used_layouts = {
+        layout
+        for _, slide in package.targets(presentation, RT_SLIDE)
+        for _, layout in package.targets(slide, RT_SLIDE_LAYOUT)
+    }
+
+    pres_xml = etree.fromstring(package.parts[presentation])
+    masters = package.targets(presentation, RT_SLIDE_MASTER)
+    unused_masters = []
+    for master_rel, master in masters:
+        master_xml = etree.fromstring(package.parts[master])
+        layout_ids = master_xml.find("p:sldLayoutIdLst", NS)
+        kept = 0
+        for rel, layout in package.targets(master, RT_SLIDE_LAYOUT):
+            if layout in used_layouts:
+                kept += 1
+                continue
+            package.rels(master).remove(rel)
+            if layout_ids is not None:
+                for layout_id in layout_ids.findall("p:sldLayoutId", NS):
+                    if layout_id.get(f"{{{R_NS}}}id") == rel.get("Id"):
+                        layout_ids.remove(layout_id)
+        package.parts[master] = serialize(master_xml)
+        if not kept:
+            unused_masters.append(master_rel)
+
+    # A presentation always keeps at least one master
+    if len(unused_masters) == len(masters):
+        unused_masters = unused_masters[1:]
+    master_ids = pres_xml.find("p:sldMasterIdLst", NS)
+    for rel in unused_masters:
+        package.rels(presentation).remove(rel)
+        for master_id in master_ids.findall("p:sldMasterId", NS):
+            if master_id.get(f"{{{R_NS}}}id") == rel.get("Id"):
+                master_ids.remove(master_id)
+    package.parts[presentation] = serialize(pres_xml)
+
+    reachable = set()
+    pending = [""]
+    while pending:
+        source = pending.pop()
+        for _, target in package.targets(source):
+            if target not in reachable and target in package.parts:
+                reachable.add(target)
+                pending.append(target)
+    unreachable = {
+        name for name in package.parts
+        if name != CONTENT_TYPES and not name.endswith(".rels") and name not in reachable
+    }
+    package.drop(unreachable)
+    return len(unreachable)
+
+
+def dedupe(package):
+    """Store byte-identical shareable parts once; return how many were dropped."""
+    incoming = {}
+    sources = [rels_source(name) for name in package.parts if name.endswith(".rels")]
+    for source in sources:
+        for rel, target in package.targets(source):
+            incoming.setdefault(target, []).append((source, rel))
+
+    kept = {}
+    aliases = {}
+    for name, refs in incoming.items():
+        if name not in package.parts or rels_path(name) in package.parts:
+            continue
+        if not all(rel.get("Type") in SHAREABLE_RELTYPES for _, rel in refs):
+            continue
+        digest = hashlib.sha256(package.parts[name]).digest()
+        first = kept.setdefault(digest, name)
+        if first != name:
+            aliases[name] = first
+
+    for name, first in aliases.items():
+        for source, rel in incoming[name]:
+            rel.set("Target", posixpath.relpath(first, posixpath.dirname(source) or "."))
+    package.save_rels()
+    package.drop(set(aliases))
+    return len(aliases)
+
+
+def _write(package, output, level, try_media):
+    with zipfile.ZipFile(output, "w") as zout:
+        names = [CONTENT_TYPES] + [name for name in package.parts if name != CONTENT_TYPES]
+        for name in names:
+            data = package.parts[name]
+            info = package.infos.get(name)
+            zinfo = zipfile.ZipInfo(name, info.date_time if info else time.localtime()[:6])
+            compress_type = zipfile.ZIP_DEFLATED
+            if posixpath.splitext(name)[1].lower() in COMPRESSED_EXTENSIONS:
+                # Store media unless deflate actually saves something
+                if not try_media or len(zlib.compress(data, level)) >= len(data) * 0.99:
+                    compress_type = zipfile.ZIP_STORED
+            zout.writestr(zinfo, data, compress_type=compress_type, compresslevel=level)
+
+
+def optimize(path, output=None, profile="balanced"):
+    """Optimize the deck at ``path`` (in place unless ``output`` is given).
+
+    Returns a report with the sizes before and after, the time taken and
+    how many parts were pruned and deduplicated.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile} (choose from {', '.join(PROFILES)})")
+    start = time.perf_counter()
+    before = os.path.getsize(path)
+    package = _Package(path)
+    pruned = prune(package)
+    package.save_rels()
+    deduped = dedupe(package)
+
+    output = output or path
+    directory = os.path.dirname(os.path.abspath(output))
+    fd, tmp_path = tempfile.mkstemp(suffix=".pptx", dir=directory)
+    os.close(fd)
+    try:
+        _write(package, tmp_path, PROFILES[profile], try_media=profile == "small")
+        os.replace(tmp_path, output)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return {
+        "profile": profile,
+        "before_bytes": before,
+        "after_bytes": os.path.getsize(output),
+        "seconds": time.perf_counter() - start,
+        "parts_pruned": pruned,
+        "parts_deduped": deduped,
+    }
+
+
+def describe(report):
+    saved = report["before_bytes"] - report["after_bytes"]
+    pct = saved / report["before_bytes"] * 100 if report["before_bytes"] else 0.0
+    return (
+        f"{report['profile']:<8} {report['before_bytes']:>12,} -> {report['after_bytes']:>12,} bytes "
+        f"({-pct:+.1f}%) in {report['seconds']:.2f}s, "
+        f"{report['parts_pruned']} parts pruned, {report['parts_deduped']} deduplicated"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune, dedupe and recompress a generated deck")
+    parser.add_argument("deck", help="Path to the .pptx to optimize")
+    parser.add_argument("--output", default=None, help="Write here instead of replacing the deck")
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES) + ["all"],
+        default="balanced",
+        help="Compression profile; 'all' reports every profile without writing",
+    )
+    args = parser.parse_args()
+
+    if args.profile == "all":
+        with tempfile.TemporaryDirectory() as workdir:
+            for profile in PROFILES:
+                print(describe(optimize(args.deck, os.path.join(workdir, f"{profile}.pptx"), profile)))
+        return
+    report = optimize(args.deck, args.output, args.profile)
+    print(f"Optimized {args.output or args.deck}: {describe(report)}")
+
+
+if __name__ == "__main__":
+    main()
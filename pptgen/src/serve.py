@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""Local HTTP render service that keeps compiled templates in memory.
+
+    python pptgen/src/generate_ppt.py serve --template-dir pptgen/templates --port 8765
+
+    curl -X POST -H "Content-Type: application/json" \\
+         --data '[{"title": "Q1", "body": "Up 4%"}]' \\
+         "http://127.0.0.1:8765/render?template=template.pptx" -o deck.pptx
+
+Endpoints:
+
+    POST /render?template=NAME   JSON (a list of objects, or {"rows": [...]})
+                                 or CSV (Content-Type: text/csv) -> .pptx;
+                                 add &route_by=COLUMN to route rows to sections
+    GET  /templates              loaded templates and their placeholders
+    GET  /metrics                request, queue, latency and cache counters
+    GET  /healthz                liveness check
+
+Renders run on a fixed pool of ``--workers`` threads. Up to ``--queue``
+further requests wait for a worker; beyond that the server answers 503
+with Retry-After instead of piling up work. Templates are compiled once
+and recompiled only when their file changes.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from generate_ppt import Template
+
+PPTX_CT = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+TEMPLATE_EXTENSIONS = (".pptx", ".potx")
+# Rendered decks larger than this are spooled to a temporary file
+SPOOL_BYTES = 8 * 2**20
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TemplateCache:
+    """Compiled templates by name, recompiled when their file changes.
+
+    Only templates found in ``directories`` (or listed in ``paths``) can be
+    requested, and at most ``max_entries`` stay compiled at once.
+    """
+
+    def __init__(self, directories=(), paths=(), max_entries=32):
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.paths = {os.path.basename(p): os.path.abspath(p) for p in paths}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def names(self):
+        names = set(self.paths)
+        for directory in self.directories:
+            names.update(n for n in os.listdir(directory) if n.lower().endswith(TEMPLATE_EXTENSIONS))
+        return sorted(names)
+
+    def resolve(self, name):
+        if name in self.paths:
+            return self.paths[name]
+        if name and os.path.basename(name) == name and name.lower().endswith(TEMPLATE_EXTENSIONS):
+            for directory in self.directories:
+                path = os.path.join(directory, name)
+                if os.path.isfile(path):
+                    return path
+        raise ServiceError(404, f"Unknown template: {name}")
+
+    def get(self, name):
+        path = self.resolve(name)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Compile outside the lock; a concurrent miss just compiles twice
+        template = Template(path)
+        with self._lock:
+            self._entries[path] = (stamp, template)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return template
+
+    def preload(self):
+        for name in self.names():
+            self.get(name)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RenderService:
+    """Admission control, the worker pool and metrics for one server."""
+
+    def __init__(self, templates, workers=2, queue=8, max_body=50 * 2**20):
+        self.templates = templates
+        self.workers = workers
+        self.queue = queue
+        self.max_body = max_body
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="render")
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters = Counter()
+        self.in_flight = 0
+        self.render_seconds = 0.0
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def render(self, name, data, route_by=None):
+        """Render ``data`` to a spooled file, or raise 503 when saturated."""
+        if not self._slots.acquire(blocking=False):
+            self.count("rejected")
+            raise ServiceError(503, "Render queue is full, retry later")
+        try:
+            return self.pool.submit(self._render, name, data, route_by).result()
+        finally:
+            self._slots.release()
+
+    def _render(self, name, data, route_by):
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            template = self.templates.get(name)
+            output = tempfile.SpooledTemporaryFile(SPOOL_BYTES)
+            try:
+                template.render(data, output, route_by=route_by)
+            except (KeyError, ValueError) as e:
+                # The rows or query don't fit the template, e.g. an unknown route_by column
+                output.close()
+                raise ServiceError(400, str(e))
+            return output
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.in_flight -= 1
+                self.render_seconds += elapsed
+
+    def metrics(self):
+        with self._lock:
+            counters = dict(self.counters)
+            in_flight = self.in_flight
+            render_seconds = self.render_seconds
+        rendered = counters.get("rendered", 0)
+        return {
+            "uptime_s": time.time() - self.started,
+            "workers": self.workers,
+            "queue_limit": self.queue,
+            "in_flight": in_flight,
+            "requests": counters,
+            "render_seconds_total": render_seconds,
+            "render_seconds_avg": render_seconds / rendered if rendered else 0.0,
+            "templates_cached": len(self.templates),
+            "template_cache_hits": self.templates.hits,
+            "template_cache_misses": self.templates.misses,
+        }
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def parse_payload(body, content_type):
+    """Return the rows of a JSON or CSV request body as a list of dicts."""
+    text = body.decode("utf-8-sig")
+    if content_type.startswith("text/csv"):
+        return list(csv.DictReader(io.StringIO(text, newline="")))
+    try:
+        payload = json.loads(text)
+    except ValueError as e:
+        raise ServiceError(400, f"Invalid JSON: {e}")
+    if isinstance(payload, dict):
+        payload = payload.get("rows")
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise ServiceError(400, "Expected a list of objects or {\"rows\": [...]}")
+    return payload
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    server_version = "pptgen"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/metrics":
+            self._send_json(200, self.service.metrics())
+        elif path == "/render":
+            self._send_json(405, {"error": "Use POST /render?template=NAME"})
+        elif path == "/templates":
+            templates = self.service.templates
+            try:
+                body = {name: templates.get(name).placeholders for name in templates.names()}
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            self._send_json(200, body)
+        else:
+            self._send_json(404, {"error": f"Not found: {path}"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/render":
+            self._send_json(404, {"error": f"Not found: {url.path}"})
+            return
+        self.service.count("received")
+        query = parse_qs(url.query)
+        try:
+            name = query.get("template", [None])[0]
+            if not name:
+                raise ServiceError(400, "Missing ?template=")
+            if "sheet" in query:
+                raise ServiceError(400, "?sheet= does not apply; POST the rows as JSON or CSV")
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                self.close_connection = True
+                raise ServiceError(400, "Content-Length must be a number")
+            if length > self.service.max_body:
+                self.close_connection = True
+                raise ServiceError(413, f"Body larger than {self.service.max_body} bytes")
+            data = parse_payload(self.rfile.read(length), self.headers.get("Content-Type", ""))
+            output = self.service.render(name, data, route_by=query.get("route_by", [None])[0])
+        except ServiceError as e:
+            self.service.count(f"status_{e.status}")
+            self._send_json(e.status, {"error": str(e)}, retry=e.status == 503)
+            return
+        except Exception as e:
+            self.service.count("status_500")
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        with output:
+            size = output.seek(0, io.SEEK_END)
+            output.seek(0)
+            self.send_response(200)
+            self.send_header("Content-Type", PPTX_CT)
+            self.send_header("Content-Length", str(size))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.splitext(name)[0]}.pptx"')
+            self.end_headers()
+            shutil.copyfileobj(output, self.wfile, 1 << 16)
+        self.service.count("rendered")
+        self.service.count("status_200")
+
+    def _send_json(self, status, payload, retry=False):
+        body = (json.dumps(payload, indent=2) + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if retry:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(service, host="127.0.0.1", port=8765, quiet=False):
+    """Return a bound (not yet serving) HTTP server for ``service``."""
+    server = ThreadingHTTPServer((host, port), RenderHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve deck rendering over local HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (0 picks a free port)")
+    parser.add_argument(
+        "--template", action="append", default=[], help="Template file to serve (repeatable)"
+    )
+    parser.add_argument(
+        "--template-dir", action="append", default=[], help="Serve every .pptx/.potx in this directory"
+    )
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent renders")
+    parser.add_argument("--queue", type=int, default=8, help="Requests allowed to wait for a worker")
+    parser.add_argument("--cache-size", type=int, default=32, help="Compiled templates kept in memory")
+    parser.add_argument("--max-body-mb", type=int, default=50, help="Largest accepted request body")
+    parser.add_argument("--quiet", action="store_true", help="Do not log each request")
+    args = parser.parse_args(argv)
+    if not (args.template or args.template_dir):
+        parser.error("give at least one --template or --template-dir")
+
+    templates = TemplateCache(args.template_dir, args.template, max_entries=args.cache_size)
+    templates.preload()
+    service = RenderService(templates, args.workers, args.queue, args.max_body_mb * 2**20)
+    server = make_server(service, args.host, args.port, quiet=args.quiet)
+    host, port = server.server_address[:2]
+    print(f"Serving {len(templates)} template(s) on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""On-disk cache of parsed workbook sheets.
+
+Parsing a sheet with openpyxl is by far the slowest part of a run, and the
+same workbook is read by several scripts in a pipeline. The columns read
+from a sheet are stored column by column in a pickle keyed by the
+workbook's path and sheet; columns read later are added to the same entry.
+An entry is reused while the workbook's mtime and size match (or, after a
+touch or copy, while its SHA-256 matches). The least recently used entries
+are evicted once the cache grows past its size limit.
+
+    PPTGEN_CACHE_DIR      cache directory (default ~/.cache/pptgen/sheets)
+    PPTGEN_CACHE_MAX_MB   size limit in MiB (default 256)
+    PPTGEN_NO_CACHE=1     always parse the workbook
+"""
+
+import hashlib
+import os
+import pickle
+
+import diskcache
+from diskcache import enabled, file_hash
+
+# Bump when the stored layout or the parsing rules change
+CACHE_VERSION = 2
+DEFAULT_MAX_MB = 256
+ENTRY_SUFFIX = ".pickle"
+
+
+def cache_dir():
+    return diskcache.cache_dir("PPTGEN_CACHE_DIR", "sheets")
+
+
+def max_bytes():
+    return diskcache.max_bytes("PPTGEN_CACHE_MAX_MB", DEFAULT_MAX_MB)
+
+
+def _entry_path(data_path, sheet):
+    key = f"{os.path.abspath(data_path)}\x00{'' if sheet is None else sheet}"
+    return os.path.join(cache_dir(), hashlib.sha1(key.encode("utf-8")).hexdigest() + ENTRY_SUFFIX)
+
+
+def load(data_path, sheet):
+    """Return the cached ``(header, columns)`` for a sheet, or None on a miss.
+
+    ``header`` lists every column of the sheet and ``columns`` maps the
+    names of the cached columns to their values.
+    """
+    path = _entry_path(data_path, sheet)
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        st = os.stat(data_path)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if entry.get("version") != CACHE_VERSION or entry["size"] != st.st_size:
+        return None
+    if entry["mtime_ns"] != st.st_mtime_ns:
+        if entry["sha256"] != file_hash(data_path):
+            return None
+        # Same content under a new mtime; record it so the next check is cheap
+        entry["mtime_ns"] = st.st_mtime_ns
+        _write(path, entry)
+    else:
+        diskcache.touch(path)
+    return entry["header"], entry["columns"]
+
+
+def store(data_path, sheet, header, columns):
+    """Cache columns of a sheet and evict old entries; failures are ignored.
+
+    ``columns`` maps column names to values and replaces any earlier entry,
+    so callers merge in the columns they loaded first.
+    """
+    try:
+        st = os.stat(data_path)
+        entry = {
+            "version": CACHE_VERSION,
+            "path": os.path.abspath(data_path),
+            "sheet": sheet,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": file_hash(data_path),
+            "header": header,
+            "columns": columns,
+        }
+        os.makedirs(cache_dir(), exist_ok=True)
+        _write(_entry_path(data_path, sheet), entry)
+        evict(max_bytes())
+    except (OSError, pickle.PicklingError):
+        pass
+
+
+def _write(path, entry):
+    diskcache.write_atomic(path, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def evict(limit):
+    """Remove least recently used sheets until the cache fits in ``limit`` bytes."""
+    diskcache.evict(cache_dir(), limit, (ENTRY_SUFFIX,))
+
+
+def clear():
+    """Remove every cached sheet."""
+    diskcache.clear(cache_dir(), (ENTRY_SUFFIX,))
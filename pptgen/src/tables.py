@@ -0,0 +1,146 @@
+"""Fill a slide table from a DataFrame in one XML build.
+
+Setting cell text through python-pptx (``cell.text_frame.clear()`` and
+``cell.text_frame.text = ...``) walks the object model several times per
+cell. ``fill_table`` instead turns one row of the table into a string
+skeleton, renders every record into it and parses all the new rows in a
+single pass. Each column keeps the style row's cell properties (fill,
+borders, margins), paragraph properties and first run's formatting.
+
+    from tables import fill_table
+    fill_table(shape.table, frame, columns=["Client", "Project Name", "Rev"], formats={"Rev": "$,.0f"})
+"""
+
+import copy
+
+from lxml import etree
+
+from engine import A_NS, NS, P_NS, Skeleton, mark_region, serialize, slot, split_regions
+from formatting import ValueFormat
+from ingest import cell_text
+
+
+def _table_element(table):
+    # A GraphicFrame, a python-pptx Table or an a:tbl element
+    if hasattr(table, "has_table"):
+        table = table.table
+    return getattr(table, "_tbl", table)
+
+
+def _records(data, columns):
+    """Return ``(columns, rows)`` for a DataFrame, dicts or sequences."""
+    if hasattr(data, "itertuples"):
+        columns = [str(col) for col in data.columns] if columns is None else list(columns)
+        return columns, data[columns].itertuples(index=False, name=None)
+    rows = list(data)
+    if rows and isinstance(rows[0], dict):
+        if columns is None:
+            columns = list(rows[0])
+        return list(columns), [tuple(row.get(col) for col in columns) for row in rows]
+    if columns is None:
+        raise ValueError("columns are required when rows are plain sequences")
+    return list(columns), rows
+
+
+def _style_cell(tc, slot):
+    """Reduce a cell's text to one paragraph with one run holding ``slot``.
+
+    The first paragraph's properties and the first run's formatting (or
+    the paragraph's end-of-paragraph formatting) are kept.
+    """
+    tx_body = tc.find("a:txBody", NS)
+    if tx_body is None:
+        tx_body = etree.Element(f"{{{A_NS}}}txBody")
+        etree.SubElement(tx_body, f"{{{A_NS}}}bodyPr")
+        etree.SubElement(tx_body, f"{{{A_NS}}}lstStyle")
+        tc.insert(0, tx_body)
+    paragraphs = tx_body.findall("a:p", NS)
+    first = paragraphs[0] if paragraphs else None
+    p_pr = r_pr = None
+    if first is not None:
+        p_pr = first.find("a:pPr", NS)
+        r_pr = first.find("a:r/a:rPr", NS)
+        if r_pr is None:
+            r_pr = first.find("a:endParaRPr", NS)
+    for paragraph in paragraphs:
+        tx_body.remove(paragraph)
+
+    paragraph = etree.SubElement(tx_body, f"{{{A_NS}}}p")
+    if p_pr is not None:
+        paragraph.append(copy.deepcopy(p_pr))
+    run = etree.SubElement(paragraph, f"{{{A_NS}}}r")
+    if r_pr is not None:
+        run_pr = copy.deepcopy(r_pr)
+        run_pr.tag = f"{{{A_NS}}}rPr"
+        run.append(run_pr)
+    etree.SubElement(run, f"{{{A_NS}}}t").text = slot
+
+
+def fill_table(table, data, columns=None, formats=None, style_row=-1, row_height=None):
+    """Replace a table's rows from ``style_row`` on with one row per record.
+
+    ``table`` is a python-pptx table (or its graphic frame, or the ``a:tbl``
+    element). ``data`` is a DataFrame or a list of dicts or sequences;
+    ``columns`` picks the data columns that fill the table's columns in
+    order, and ``formats`` maps a column to a format spec such as
+    ``"$,.0f"``. Rows above ``style_row`` (headers) are kept. Every new row
+    is ``row_height`` EMU high, or as high as the style row, and the
+    table's frame is resized to fit. Returns the number of rows written.
+    """
+    tbl = _table_element(table)
+    rows = tbl.findall("a:tr", NS)
+    if not rows:
+        raise ValueError("Table has no rows to take the style from")
+    index = style_row % len(rows)
+    columns, records = _records(data, columns)
+
+    # Build the skeleton on a copy so the table is untouched until the
+    # new rows are ready
+    work = copy.deepcopy(tbl)
+    work_rows = work.findall("a:tr", NS)
+    for tr in work_rows[index + 1:]:
+        work.remove(tr)
+    tr = work_rows[index]
+    if row_height is not None:
+        tr.set("h", str(int(row_height)))
+    cells = tr.findall("a:tc", NS)
+    names = [columns[i] if i < len(columns) else None for i in range(len(cells))]
+    for i, tc in enumerate(cells):
+        _style_cell(tc, slot(i) if names[i] is not None else "")
+    mark_region(tr)
+
+    head, row_text, tail = split_regions(serialize(work).decode("utf-8"))
+    skeleton = Skeleton(row_text, [str(i) for i in range(len(cells))])
+
+    formatters = [
+        ValueFormat(formats[name]) if formats and name in formats else cell_text for name in names
+    ]
+    positions = [columns.index(name) if name is not None else None for name in names]
+    rendered = []
+    for record in records:
+        values = {
+            str(i): fmt(record[pos])
+            for i, (pos, fmt) in enumerate(zip(positions, formatters))
+            if pos is not None
+        }
+        rendered.append(skeleton.render(values))
+    new_tbl = etree.fromstring((head + "".join(rendered) + tail).encode("utf-8"))
+
+    # Swap the rows in place so python-pptx objects holding the table stay valid
+    for old in rows[index:]:
+        tbl.remove(old)
+    new_rows = new_tbl.findall("a:tr", NS)[index:]
+    anchor = rows[index - 1] if index else None
+    for new in new_rows:
+        if anchor is None:
+            tbl.append(new)
+        else:
+            anchor.addnext(new)
+        anchor = new
+
+    frame = next(tbl.iterancestors(f"{{{P_NS}}}graphicFrame"), None)
+    if frame is not None:
+        ext = frame.find("p:xfrm/a:ext", NS)
+        if ext is not None:
+            ext.set("cy", str(sum(int(row.get("h", "0")) for row in tbl.iterfind("a:tr", NS))))
+    return len(new_rows)
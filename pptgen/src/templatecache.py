@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""On-disk cache of compiled templates.
+
+Compiling a template reads every slide, splits it into chunks and slots,
+hashes the media for deduplication and works out which parts each
+generated slide needs. The result (a pickled ``TemplatePackage``) is
+stored under the template's SHA-256, so a copy of the same template
+anywhere reuses it. A small stamp per template path remembers its mtime,
+size and hash so warm runs do not even re-hash the file. Entries are
+evicted least recently used first once the cache grows past its limit,
+and are recompiled whenever the rendering code changes.
+
+    PPTGEN_TEMPLATE_CACHE_DIR      cache directory (default ~/.cache/pptgen/templates)
+    PPTGEN_TEMPLATE_CACHE_MAX_MB   size limit in MiB (default 64)
+    PPTGEN_NO_CACHE=1              always compile the template
+
+Templates are compiled on first use; to do it ahead of a run:
+
+    python pptgen/src/templatecache.py pptgen/templates/*.potx
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import time
+
+import charts
+import diskcache
+import engine
+import formatting
+from diskcache import enabled, file_hash, write_atomic
+from engine import TemplatePackage
+
+# Bump when the stored layout changes
+CACHE_VERSION = 1
+DEFAULT_MAX_MB = 64
+ENTRY_SUFFIX = ".template"
+STAMP_SUFFIX = ".stamp"
+
+_code_version = None
+
+
+def cache_dir():
+    return diskcache.cache_dir("PPTGEN_TEMPLATE_CACHE_DIR", "templates")
+
+
+def max_bytes():
+    return diskcache.max_bytes("PPTGEN_TEMPLATE_CACHE_MAX_MB", DEFAULT_MAX_MB)
+
+
+def code_version():
+    """Return a digest of the modules whose objects are pickled in entries."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha1(str(CACHE_VERSION).encode())
+        for module in (charts, engine, formatting):
+            with open(module.__file__, "rb") as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def _stamp_path(path):
+    key = os.path.abspath(path).encode("utf-8")
+    return os.path.join(cache_dir(), hashlib.sha1(key).hexdigest() + STAMP_SUFFIX)
+
+
+def content_hash(path):
+    """Return the template's SHA-256, trusting the last hash while mtime and size match."""
+    st = os.stat(path)
+    stamp = f"{st.st_mtime_ns} {st.st_size}"
+    stamp_path = _stamp_path(path)
+    try:
+        with open(stamp_path) as f:
+            cached_stamp, digest = f.read().rsplit(" ", 1)
+        if cached_stamp == stamp:
+            return digest
+    except (OSError, ValueError):
+        pass
+    digest = file_hash(path)
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        write_atomic(stamp_path, f"{stamp} {digest}".encode())
+    except OSError:
+        pass
+    return digest
+
+
+def _entry_path(digest):
+    return os.path.join(cache_dir(), digest + ENTRY_SUFFIX)
+
+
+def load(path):
+    """Return the cached compiled package for ``path``, or None on a miss."""
+    entry_path = _entry_path(content_hash(path))
+    try:
+        with open(entry_path, "rb") as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != code_version():
+        return None
+    diskcache.touch(entry_path)
+    package = entry["package"]
+    # The same content may live at another path
+    package.path = path
+    return package
+
+
+def store(path, package):
+    """Cache a compiled package and evict old entries; failures are ignored."""
+    try:
+        data = pickle.dumps({"version": code_version(), "package": package}, protocol=pickle.HIGHEST_PROTOCOL)
+        os.makedirs(cache_dir(), exist_ok=True)
+        write_atomic(_entry_path(content_hash(path)), data)
+        evict(max_bytes())
+    except (OSError, pickle.PicklingError):
+        pass
+
+
+def load_package(path):
+    """Return the compiled ``TemplatePackage`` for ``path``, from the cache if possible."""
+    if not enabled():
+        return TemplatePackage(path)
+    package = load(path)
+    if package is None:
+        package = TemplatePackage(path)
+        store(path, package)
+    return package
+
+
+def evict(limit):
+    """Remove least recently used templates until the cache fits in ``limit`` bytes."""
+    diskcache.evict(cache_dir(), limit, (ENTRY_SUFFIX,))
+
+
+def clear():
+    """Remove every cached template."""
+    diskcache.clear(cache_dir(), (ENTRY_SUFFIX, STAMP_SUFFIX))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile templates into the template cache")
+    parser.add_argument("templates", nargs="*", help="Templates (.pptx/.potx) to compile")
+    parser.add_argument("--clear", action="store_true", help="Remove every cached template first")
+    args = parser.parse_args()
+    if not (args.templates or args.clear):
+        parser.error("give templates to compile, or --clear")
+
+    if args.clear:
+        clear()
+        print(f"Cleared {cache_dir()}")
+    for path in args.templates:
+        start = time.perf_counter()
+        package = TemplatePackage(path)
+        compiled = time.perf_counter() - start
+        store(path, package)
+        start = time.perf_counter()
+        load(path)
+        loaded = time.perf_counter() - start
+        print(
+            f"{path}: {len(package.slides)} slide(s), compiled in {compiled * 1000:.1f} ms, "
+            f"loads from cache in {loaded * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()